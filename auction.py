@@ -0,0 +1,381 @@
+import pandas as pd
+
+import db
+import settings
+from engine import (
+    get_engine, rtm_state, RTM_COLUMNS,
+    BID_ACCEPTED, BID_STALE, BID_INSUFFICIENT_BUDGET, BID_CLOSED,
+    STOP_SOLD, STOP_UNSOLD, STOP_RTM, STOP_PENDING, RTM_DECISION_CLOSED,
+)
+
+# Auction business logic. Kept free of Streamlit so it can run on the server-side
+# clock thread (clock.py) as well as inside a script rerun. Bidding, stopping and
+# selling go through the process-wide AuctionEngine (engine.py).
+
+# ---------- FUNCTIONS ----------
+
+def get_state_version():
+    """
+    Current auction state version. Bumped (by triggers, see db.VERSIONED_TABLES) on
+    every write to bids, items, sales, teams, sponsors or settings, so an unchanged
+    value means nothing on screen needs to be re-queried.
+    """
+    c = db.get_read_cursor()
+    c.execute("SELECT version FROM auction_state WHERE id = 1")
+    row = c.fetchone()
+    return row[0] if row else 0
+
+def get_active_item():
+    c = db.get_read_cursor()
+    c.execute("SELECT id, name, rating, category, nationality, image_url, base_price, current_bid, is_active, winner_team, unsold_timestamp, previous_team, last_activity_timestamp FROM items WHERE is_active = 1 LIMIT 1")
+    return c.fetchone()
+
+def get_highest_bid(item_id):
+    c = db.get_read_cursor()
+    c.execute("SELECT team_name, amount FROM bids WHERE item_id = ? ORDER BY amount DESC LIMIT 1", (item_id,))
+    return c.fetchone()
+
+def get_bid_increment(current_bid):
+    """
+    Returns bid increment based on current bid amount using the bidding tiers
+    from the settings cache (hardcoded fallback tiers if none are configured).
+    """
+    return settings.get_settings().bid_increment(current_bid)
+
+def get_bid_duration():
+    """Bid timer length in seconds (timing_bid_duration), defaulting to 60."""
+    return settings.get_settings().timing_bid_duration
+
+def place_bid(item_id, team_name, current_amount, has_bids=None):
+    """
+    Places the next bid on item_id as a compare-and-swap against the bid the caller saw
+    (see AuctionEngine.place_bid). Returns {'status', 'amount', 'current_bid', 'budget'}
+    where status is one of BID_ACCEPTED, BID_STALE, BID_INSUFFICIENT_BUDGET or BID_CLOSED.
+    """
+    return get_engine().place_bid(item_id, team_name, current_amount, has_bids)
+
+def get_team_budget(team_name):
+    c = db.get_read_cursor()
+    c.execute("SELECT budget_remaining FROM teams WHERE name = ?", (team_name,))
+    result = c.fetchone()
+    return result[0] if result else 0
+
+def update_team_budget(team_name, spent_amount):
+    conn = db.get_connection()
+    c = db.get_cursor()
+    c.execute("UPDATE teams SET budget_remaining = budget_remaining - ? WHERE name = ?", (spent_amount, team_name))
+    conn.commit()
+
+def get_all_items():
+    c = db.get_read_cursor()
+    c.execute("SELECT id, name, rating, category, nationality, image_url, base_price, current_bid, is_active, winner_team, previous_team FROM items")
+    return c.fetchall()
+
+def set_active_item(item_id):
+    conn = db.get_connection()
+    c = db.get_cursor()
+    # Set all items to inactive
+    c.execute("UPDATE items SET is_active = 0 WHERE is_active = 1")
+    # Any pending RTM decision belonged to the lot being replaced (or restarted)
+    c.execute("DELETE FROM rtm_decisions")
+    
+    refund_msg = None
+    
+    # --- RESET LOGIC Check ---
+    # Retrieve current details to see if it was previously sold
+    c.execute("SELECT winner_team, current_bid, name FROM items WHERE id = ?", (item_id,))
+    row = c.fetchone()
+    if row:
+        prev_winner, sold_amount, item_name = row
+        sold_amount = sold_amount if sold_amount is not None else 0.0
+        
+        # If there was a winner, we need to REFUND the budget and delete from sold_items
+        if prev_winner:
+            # 1. Refund Budget
+            if sold_amount > 0:
+                c.execute("UPDATE teams SET budget_remaining = budget_remaining + ? WHERE name = ?", (sold_amount, prev_winner))
+                refund_msg = f"RESET: Refunded {format_amount(sold_amount)} to {prev_winner}"
+                print(refund_msg)
+            
+            # 2. Remove from sold_items
+            c.execute("DELETE FROM sold_items WHERE item_name = ?", (item_name,))
+            # Only clear winner if we actually found one
+    
+    # DO NOT Clear existing bids for this item (Preserve History)
+    # c.execute("DELETE FROM bids WHERE item_id = ?", (item_id,))
+    
+    # Calculate correct current_bid (Max of existing bids or base_price)
+    c.execute("SELECT MAX(amount) FROM bids WHERE item_id = ?", (item_id,))
+    res_max = c.fetchone()
+    resume_bid = res_max[0] if res_max and res_max[0] else None
+    
+    # Set the selected item to active and reset timestamp (and clear winner)
+    # Using SQLite current time to ensure freshness
+    
+    if resume_bid:
+         # Resume from highest bid
+         c.execute("UPDATE items SET is_active = 1, winner_team = NULL, current_bid = ?, last_activity_timestamp = strftime('%s', 'now') WHERE id = ?", (resume_bid, item_id))
+    else:
+         # Fresh start (base price)
+         c.execute("UPDATE items SET is_active = 1, winner_team = NULL, current_bid = base_price, last_activity_timestamp = strftime('%s', 'now') WHERE id = ?", (item_id,))
+
+    conn.commit()
+    return refund_msg
+
+def attempt_stop_bidding(item_id=None):
+    """
+    Checks RTM and finalized the sale/stop bidding.
+    Returns an outcome dict if flow handled (rerun needed), None if nothing happened:
+    {'outcome': STOP_RTM, 'item_id', 'rtm_state'} when the previous team gets to decide,
+    {'outcome': STOP_UNSOLD, 'item_id', 'name'} when nobody bid,
+    {'outcome': STOP_SOLD, 'item_id', 'sale': (winner, amount, name)} otherwise.
+    """
+    return get_engine().stop_bidding(item_id)
+
+def get_pending_rtm(item_id):
+    """
+    The RTM decision pending on item_id as {'active', 'item_id', 'prev_team', 'bidder',
+    'amount', 'timestamp', 'deadline'}, or None.
+    """
+    c = db.get_read_cursor()
+    c.execute(f"SELECT {RTM_COLUMNS} FROM rtm_decisions WHERE item_id = ?", (item_id,))
+    return rtm_state(c.fetchone())
+
+def expire_rtm(item_id):
+    """
+    Sells item_id to the highest bidder if its RTM decision deadline has passed.
+    Returns the outcome dict (STOP_PENDING with 'remaining' if not yet due), or None.
+    """
+    return get_engine().expire_rtm(item_id)
+
+def expire_item(item_id):
+    """
+    Closes bidding on item_id once its timer has run out: stops bidding (sale or RTM)
+    if there are bids, otherwise marks it unsold. Returns the outcome dict (STOP_PENDING
+    with 'remaining' if not yet due), or None if the item is no longer the active one.
+    """
+    return get_engine().expire(item_id)
+
+def finalize_item_sale(recipient_team=None, is_rtm=False):
+    """Sells the active item (to recipient_team for RTM); returns (winner, amount, name) or None."""
+    return get_engine().finalize_sale(recipient_team, is_rtm)
+
+def resolve_rtm(item_id, retain):
+    """
+    Answers the RTM decision pending on item_id (retain=True: previous team buys at the
+    current bid). Returns the STOP_SOLD outcome, or RTM_DECISION_CLOSED if that decision
+    is no longer open.
+    """
+    return get_engine().resolve_rtm(item_id, retain)
+
+def get_team_budgets():
+    c = db.get_read_cursor()
+    c.execute("SELECT name, budget_remaining, logo_url FROM teams")
+    return c.fetchall()
+
+def mark_as_unsold(item_id):
+    """Marks item_id unsold; returns its name."""
+    return get_engine().mark_unsold(item_id)
+
+def delete_item(item_id):
+    conn = db.get_connection()
+    c = db.get_cursor()
+    # Fetch the item name before deletion
+    c.execute("SELECT name FROM items WHERE id = ?", (item_id,))
+    item_name = c.fetchone()
+    
+    if item_name:
+        item_name = item_name[0]  # Get the actual name from the tuple
+
+        # Delete from items table
+        c.execute("DELETE FROM items WHERE id = ?", (item_id,))
+        # Delete from bids table
+        c.execute("DELETE FROM bids WHERE item_id = ?", (item_id,))
+        # Delete from sold_items and unsold_items tables
+        c.execute("DELETE FROM sold_items WHERE item_name = ?", (item_name,))
+        c.execute("DELETE FROM unsold_items WHERE item_name = ?", (item_name,))
+        c.execute("DELETE FROM rtm_decisions WHERE item_id = ?", (item_id,))
+    
+    conn.commit()
+
+def get_team_squad_info(team_name):
+    """Squad summary for a team, read from the team_stats ledger (see db._migration_4_team_stats)."""
+    c = db.get_read_cursor()
+    c.execute("SELECT spent, rating_sum, batsmen, bowlers, allrounders, wicketkeepers, indian, overseas, players FROM team_stats WHERE team_name = ?", (team_name,))
+    stats = c.fetchone() or (0,) * 9
+
+    # Fetch remaining budget for the team
+    c.execute("SELECT budget_remaining FROM teams WHERE name = ?", (team_name,))
+    budget_result = c.fetchone()  # Store the result in a variable
+    remaining_budget = budget_result[0] if budget_result else 0  # Check the variable
+
+    total_spent, total_rating, num_batters, num_bowlers, num_allrounders, num_wicketkeepers, num_indian_players, num_foreign_players, total_players_bought = stats
+    return {
+        "total_spent": total_spent,
+        "total_rating": total_rating,
+        "remaining_budget": remaining_budget,
+        "num_batters": num_batters,
+        "num_bowlers": num_bowlers,
+        "num_allrounders": num_allrounders,
+        "num_wicketkeepers": num_wicketkeepers,
+        "num_indian_players": num_indian_players,
+        "num_foreign_players": num_foreign_players,
+        "total_players_bought": total_players_bought,
+    }
+
+def get_rtm_stats(team_name):
+    """
+    Returns {'total': count, 'indian': count, 'overseas': count} of RTMs used by the team.
+    """
+    c = db.get_read_cursor()
+    c.execute("SELECT rtm_total, rtm_indian, rtm_overseas FROM team_stats WHERE team_name = ?", (team_name,))
+    row = c.fetchone()
+    total, indian, overseas = row if row else (0, 0, 0)
+    
+    return {'total': total, 'indian': indian, 'overseas': overseas}
+
+def check_rtm_eligibility(team_name, is_indian):
+    """
+    Returns True if the team is eligible to use RTM based on limits.
+    """
+    return get_engine().check_rtm_eligibility(team_name, is_indian)
+
+def get_rtm_limits():
+    """RTM limits from the settings cache (refreshed whenever regulations are saved)."""
+    return settings.get_settings().rtm_limits()
+
+def format_amount(amount):
+    """
+    Format amount in lakhs (L) or crores (Cr)
+    Examples:
+    - 5000000 -> 50L (50 lakhs)
+    - 20000000 -> 2Cr (2 crores)
+    - 22500000 -> 2.25Cr (2.25 crores)
+    """
+    if amount >= 10000000:  # 1 crore = 10000000
+        crores = amount / 10000000
+        return f"₹{crores:.2f} Cr"
+    else:
+        lakhs = amount / 100000
+        return f"₹{lakhs:.0f}L"
+
+def get_sold_amount(item_name):
+    c = db.get_read_cursor()
+    c.execute("SELECT sold_amount FROM sold_items WHERE item_name = ?", (item_name,))
+    result = c.fetchone()
+    return result[0] if result else 0
+
+def reset_all_data():
+    """
+    Reset all data to start fresh:
+    - Clear all bids
+    - Reset all items to inactive and no winner
+    - Reset current_bid to base_price (preserves original base prices)
+    - Clear sold_items table
+    - Clear unsold_items table
+    - Reset team budgets to initial budgets
+    """
+    conn = db.get_connection()
+    c = db.get_cursor()
+    try:
+        # Clear all bids
+        c.execute("DELETE FROM bids")
+        
+        # Reset all items to inactive and no winner, and reset current_bid to base_price
+        c.execute("""
+            UPDATE items SET 
+                is_active = 0, 
+                winner_team = NULL, 
+                current_bid = base_price,
+                unsold_timestamp = 0
+        """)
+        
+        # Clear sold_items table
+        c.execute("DELETE FROM sold_items")
+        
+        # Clear unsold_items table
+        c.execute("DELETE FROM unsold_items")
+
+        # Drop any pending RTM decision
+        c.execute("DELETE FROM rtm_decisions")
+        
+        # Reset team budgets to initial budgets
+        c.execute("UPDATE teams SET budget_remaining = initial_budget")
+        
+        # Commit all changes
+        conn.commit()
+        
+        return True
+    except Exception as e:
+        print(f"Error resetting data: {e}")
+        return False
+
+def export_all_data():
+    """
+    Export all database data to CSV format
+    Returns a dictionary with different CSV files for different data types
+    """
+    c = db.get_read_cursor()
+    try:
+        # Get all items data
+        c.execute("SELECT id, name, rating, category, nationality, image_url, base_price, current_bid, is_active, winner_team, unsold_timestamp FROM items")
+        items_data = c.fetchall()
+        
+        # Get all teams data
+        c.execute("SELECT name, budget_remaining, logo_url, initial_budget FROM teams")
+        teams_data = c.fetchall()
+        
+        # Get all bids data
+        c.execute("SELECT id, item_id, team_name, amount, timestamp FROM bids")
+        bids_data = c.fetchall()
+        
+        # Get all sold items data
+        c.execute("SELECT id, item_name, sold_amount, rating, category, nationality, team_bought, timestamp FROM sold_items")
+        sold_items_data = c.fetchall()
+        
+        # Get all unsold items data
+        c.execute("SELECT id, item_name, rating, category, nationality, status, timestamp FROM unsold_items")
+        unsold_items_data = c.fetchall()
+        
+        # Create DataFrames
+        items_df = pd.DataFrame(items_data, columns=[
+            'ID', 'Name', 'Rating', 'Category', 'Nationality', 'Image URL', 
+            'Base Price', 'Current Bid', 'Is Active', 'Winner Team', 'Unsold Timestamp'
+        ])
+        
+        teams_df = pd.DataFrame(teams_data, columns=[
+            'Team Name', 'Budget Remaining', 'Logo URL', 'Initial Budget'
+        ])
+        
+        bids_df = pd.DataFrame(bids_data, columns=[
+            'Bid ID', 'Item ID', 'Team Name', 'Amount', 'Timestamp'
+        ])
+        
+        sold_items_df = pd.DataFrame(sold_items_data, columns=[
+            'ID', 'Item Name', 'Sold Amount', 'Rating', 'Category', 
+            'Nationality', 'Team Bought', 'Timestamp'
+        ])
+        
+        unsold_items_df = pd.DataFrame(unsold_items_data, columns=[
+            'ID', 'Item Name', 'Rating', 'Category', 'Nationality', 'Status', 'Timestamp'
+        ])
+        
+        # Format amounts in the DataFrames
+        items_df['Base Price'] = items_df['Base Price'].apply(lambda x: format_amount(x))
+        items_df['Current Bid'] = items_df['Current Bid'].apply(lambda x: format_amount(x))
+        teams_df['Budget Remaining'] = teams_df['Budget Remaining'].apply(lambda x: format_amount(x))
+        teams_df['Initial Budget'] = teams_df['Initial Budget'].apply(lambda x: format_amount(x))
+        bids_df['Amount'] = bids_df['Amount'].apply(lambda x: format_amount(x))
+        sold_items_df['Sold Amount'] = sold_items_df['Sold Amount'].apply(lambda x: format_amount(x))
+        
+        return {
+            'items': items_df,
+            'teams': teams_df,
+            'bids': bids_df,
+            'sold_items': sold_items_df,
+            'unsold_items': unsold_items_df
+        }
+        
+    except Exception as e:
+        print(f"Error exporting data: {e}")
+        return None
@@ -0,0 +1,249 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import auction
+import datagen
+import db
+
+# Microbenchmarks for the auction core on databases generated by datagen
+# (seeded, so every run of a scale sees the same data). Each scale runs
+# in its own process against a fresh copy of its database, e.g.
+#
+#   python -m bench                                    # small + medium
+#   python -m bench --scale all --out bench.json       # adds 50k players / 2M bids
+#   python -m bench --baseline bench.json              # exit 1 on a regression
+#
+# A function regresses when its median call time grows by more than --threshold
+# (and by more than MIN_REGRESSION_MS, so microsecond noise doesn't count).
+
+# ---------- CONFIG ----------
+# datagen options; purses (and, for the bigger scales, squad sizes) are raised
+# so the bid ladders aren't cut short by the limits
+SCALES = {
+    'small': {'players': 200, 'teams': 10, 'bids': 20000, 'initial_purse': 20000000000},
+    'medium': {'players': 5000, 'teams': 50, 'bids': 250000,
+               'max_squad_size': 80, 'max_overseas': 25, 'initial_purse': 50000000000},
+    'large': {'players': 50000, 'teams': 200, 'bids': 2000000,
+              'max_squad_size': 250, 'max_overseas': 80, 'initial_purse': 200000000000},
+}
+DEFAULT_SCALES = ['small', 'medium']
+DEFAULT_THRESHOLD = 0.25     # fail when a median is 25% slower than the baseline
+MIN_REGRESSION_MS = 0.05
+DEFAULT_SEED = 1
+DATA_VERSION = 3             # bump when the generated data changes shape
+
+REPEAT = 500                 # calls for the cheap reads
+WRITE_REPEAT = 30            # set_active_item / finalize_item_sale calls
+BIDS_PER_LOT = 50            # place_bid calls per lot (keeps amounts in budget)
+LOTS = 10
+EXPORT_REPEAT = 3
+
+
+# ---------- DATA ----------
+
+def database_for(scale, seed, data_dir):
+    """Path of the generated database for a scale, building it on first use."""
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"bench-{scale}-s{seed}-v{DATA_VERSION}.db")
+    if not os.path.exists(path):
+        started = time.perf_counter()
+        partial = path + ".partial"
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(partial + suffix):
+                os.remove(partial + suffix)
+        summary = datagen.generate(partial, seed=seed, **SCALES[scale])
+        os.replace(partial, path)
+        print(f"Generated {scale} database in {time.perf_counter() - started:.1f}s: {summary['bids']} bids, "
+              f"{summary['sold']} sold, {summary['unsold']} unsold ({path})", file=sys.stderr)
+    return path
+
+
+# ---------- BENCHMARKS ----------
+
+def summarize(samples):
+    samples = sorted(samples)
+    pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))]
+    return {
+        'calls': len(samples),
+        'median_ms': pick(0.5) * 1000,
+        'p90_ms': pick(0.9) * 1000,
+        'min_ms': samples[0] * 1000,
+        'total_s': sum(samples),
+    }
+
+
+def timed(fn, repeat, setup=None):
+    """Times repeat calls of fn(*setup(i)); setup runs outside the timing."""
+    samples = []
+    for i in range(repeat):
+        args = setup(i) if setup else ()
+        started = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+def run_benchmarks():
+    """Runs every benchmark against IBL_DB_PATH; the database is modified."""
+    db.migrate()
+    c = db.get_read_cursor()
+    c.execute("SELECT name FROM teams ORDER BY budget_remaining DESC")
+    teams = [row[0] for row in c.fetchall()]
+    c.execute("SELECT DISTINCT item_id FROM bids ORDER BY item_id")
+    bid_items = [row[0] for row in c.fetchall()]
+    c.execute("SELECT id FROM items WHERE winner_team IS NULL ORDER BY id")
+    fresh = [row[0] for row in c.fetchall()]
+    needed = WRITE_REPEAT * 2 + LOTS
+    if len(fresh) < needed or len(teams) < 2 or not bid_items:
+        raise RuntimeError(f"database needs at least {needed} unauctioned players, 2 teams and some bids")
+    fresh = iter(fresh)
+    results = {}
+
+    results['get_highest_bid'] = timed(auction.get_highest_bid, REPEAT, lambda i: (bid_items[i * 7919 % len(bid_items)],))
+    results['get_team_squad_info'] = timed(auction.get_team_squad_info, REPEAT, lambda i: (teams[i % len(teams)],))
+    results['get_rtm_stats'] = timed(auction.get_rtm_stats, REPEAT, lambda i: (teams[i % len(teams)],))
+    results['set_active_item'] = timed(auction.set_active_item, WRITE_REPEAT, lambda i: (next(fresh),))
+
+    # place_bid: BIDS_PER_LOT alternating bids on each of LOTS fresh lots
+    samples = []
+    for _ in range(LOTS):
+        item_id = next(fresh)
+        auction.set_active_item(item_id)
+        current, has_bids = auction.get_active_item()[7], False
+        for n in range(BIDS_PER_LOT):
+            started = time.perf_counter()
+            result = auction.place_bid(item_id, teams[n % 2], current, has_bids)
+            samples.append(time.perf_counter() - started)
+            if result['status'] != auction.BID_ACCEPTED:
+                raise RuntimeError(f"place_bid returned {result['status']}")
+            current, has_bids = result['current_bid'], True
+    results['place_bid'] = summarize(samples)
+
+    def open_lot_with_bid(i):
+        item_id = next(fresh)
+        auction.set_active_item(item_id)
+        auction.place_bid(item_id, teams[i % 2], auction.get_active_item()[7], has_bids=False)
+        return ()
+    results['finalize_item_sale'] = timed(auction.finalize_item_sale, WRITE_REPEAT, open_lot_with_bid)
+
+    results['export_all_data'] = timed(auction.export_all_data, EXPORT_REPEAT)
+    # Last: it clears the auction the other benchmarks need
+    results['reset_all_data'] = timed(auction.reset_all_data, 1)
+    return results
+
+
+def run_scale(scale, seed, data_dir):
+    """Runs the benchmarks for one scale in a child process on a copy of its database."""
+    source = database_for(scale, seed, data_dir)
+    workdir = tempfile.mkdtemp(prefix="ibl-bench-")
+    try:
+        work = os.path.join(workdir, "players_game.db")
+        shutil.copyfile(source, work)
+        env = dict(os.environ, IBL_DB_PATH=work)
+        proc = subprocess.run([sys.executable, "-m", "bench", "--worker"], env=env,
+                              capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise RuntimeError(f"{scale} benchmarks failed:\n{proc.stderr}")
+        return json.loads(proc.stdout.strip().splitlines()[-1])
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+# ---------- REPORT ----------
+
+def compare(results, baseline, threshold):
+    """Returns [(scale, function, baseline_ms, median_ms)] for every regression."""
+    regressions = []
+    for scale, entry in results['scales'].items():
+        old_results = baseline.get('scales', {}).get(scale, {}).get('results', {})
+        for name, stats in entry['results'].items():
+            old = old_results.get(name)
+            if old is None:
+                continue
+            new_ms, old_ms = stats['median_ms'], old['median_ms']
+            if new_ms > old_ms * (1 + threshold) and new_ms - old_ms > MIN_REGRESSION_MS:
+                regressions.append((scale, name, old_ms, new_ms))
+    return regressions
+
+
+def print_results(results, baseline=None):
+    for scale, entry in results['scales'].items():
+        config = entry['config']
+        print(f"\n{scale}: {config['players']} players, {config['teams']} teams, {config['bids']} bids")
+        old_results = (baseline or {}).get('scales', {}).get(scale, {}).get('results', {})
+        for name, stats in entry['results'].items():
+            line = (f"  {name:<20} {stats['calls']:>5} calls  median {stats['median_ms']:>9.3f} ms  "
+                    f"p90 {stats['p90_ms']:>9.3f} ms  min {stats['min_ms']:>9.3f} ms")
+            if name in old_results and old_results[name]['median_ms']:
+                line += f"  ({stats['median_ms'] / old_results[name]['median_ms'] - 1:+.0%} vs baseline)"
+            print(line)
+
+
+# ---------- ENTRY POINT ----------
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m bench", description="IBL auction microbenchmarks.")
+    parser.add_argument("--scale", action="append", choices=list(SCALES) + ["all"],
+                        help="scale to run (repeatable; default small and medium)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="seed for the generated databases")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "ibl-bench"),
+                        help="where generated databases are cached")
+    parser.add_argument("--out", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown of a median before it counts as a regression (0.25 = 25%%)")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.worker:
+        print(json.dumps(run_benchmarks()))
+        return 0
+
+    scales = args.scale or DEFAULT_SCALES
+    if "all" in scales:
+        scales = list(SCALES)
+    results = {
+        'meta': {
+            'created': datetime.now().isoformat(timespec="seconds"),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'data_version': DATA_VERSION,
+        },
+        'scales': {},
+    }
+    for scale in dict.fromkeys(scales):
+        results['scales'][scale] = {'config': SCALES[scale], 'results': run_scale(scale, args.seed, args.data_dir)}
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if baseline is None:
+        return 0
+    regressions = compare(results, baseline, args.threshold)
+    for scale, name, old_ms, new_ms in regressions:
+        print(f"REGRESSION {scale}/{name}: median {old_ms:.3f} ms -> {new_ms:.3f} ms", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
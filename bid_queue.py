@@ -0,0 +1,63 @@
+import queue
+import threading
+from concurrent.futures import Future
+
+from engine import get_engine
+
+# ---------- CONFIG ----------
+MAX_BATCH = 64          # bids applied per transaction at most
+RESULT_TIMEOUT = 15.0   # how long place_bid() waits for its outcome (> db.BUSY_TIMEOUT_MS)
+
+
+class BidQueue(threading.Thread):
+    """
+    Single writer for bids from every session in the process.
+
+    Sessions submit() a bid and get a Future; the writer thread takes bids in
+    arrival order and applies whatever has queued up (up to MAX_BATCH) in one
+    AuctionEngine.place_bids() transaction, so a burst of clicks costs one
+    commit and is decided first come, first served instead of by whichever
+    thread wins the SQLite lock. Each Future resolves to the usual place_bid()
+    result dict once its batch has committed, or to the exception if it failed.
+    """
+
+    def __init__(self, engine=None, max_batch=MAX_BATCH):
+        super().__init__(name="bid-queue", daemon=True)
+        self.engine = engine or get_engine()
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+
+    def submit(self, item_id, team_name, current_amount, has_bids=None):
+        """Queues a bid; returns a Future for its place_bid() result."""
+        future = Future()
+        self._queue.put(((item_id, team_name, current_amount, has_bids), future))
+        return future
+
+    def place_bid(self, item_id, team_name, current_amount, has_bids=None, timeout=RESULT_TIMEOUT):
+        """submit() and wait for the outcome; raises TimeoutError if it takes longer than timeout."""
+        return self.submit(item_id, team_name, current_amount, has_bids).result(timeout=timeout)
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def run(self):
+        while True:
+            batch = self._next_batch()
+            batch = [(bid, future) for bid, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                results = self.engine.place_bids([bid for bid, _ in batch])
+            except Exception as e:
+                print(f"Bid queue error: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+            else:
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
@@ -0,0 +1,172 @@
+import threading
+import time
+import uuid
+from collections import deque
+
+import metrics
+
+# End-to-end bid latency. Every accepted bid gets a trace at commit, tagged with
+# the state_version the commit produced; from there it is followed through
+#
+#   click      the Place Bid / Bid press reaching the server (the session's run)
+#   commit     the bid's transaction committed (engine)
+#   snapshot   the first shared snapshot built at or after that version
+#   visible    each session's first live panel built from such a snapshot
+#
+# so click->commit and commit->visible can be broken down by who was watching:
+# team, viewer or admin sessions. Kept in memory for this process; shown in the
+# admin Diagnostics tab and exported with the metrics (metrics.py).
+
+# ---------- CONFIG ----------
+TRACE_HISTORY = 500       # traces kept for the recent-bids view and matching
+SAMPLES = 2000            # latency samples kept per (stage, session type) for percentiles
+SESSION_TYPES = ("team", "viewer", "admin")
+
+_lock = threading.Lock()
+_traces = deque(maxlen=TRACE_HISTORY)  # oldest first, so versions ascend
+_samples = {}                           # (stage, session type) -> deque of seconds
+
+BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0)
+CLICK_TO_COMMIT = metrics.register(metrics.Histogram(
+    "ibl_bid_click_to_commit_seconds", "Place Bid press to committed bid.", ["session_type"], BUCKETS))
+COMMIT_TO_SNAPSHOT = metrics.register(metrics.Histogram(
+    "ibl_bid_commit_to_snapshot_seconds", "Committed bid to the first snapshot that includes it.", buckets=BUCKETS))
+COMMIT_TO_VISIBLE = metrics.register(metrics.Histogram(
+    "ibl_bid_commit_to_visible_seconds", "Committed bid to its first render in a session.", ["session_type"], BUCKETS))
+
+
+def _sample(stage, session_type, seconds):
+    with _lock:
+        samples = _samples.get((stage, session_type))
+        if samples is None:
+            samples = _samples[(stage, session_type)] = deque(maxlen=SAMPLES)
+        samples.append(seconds)
+
+
+# ---------- RECORDING ----------
+
+def committed(item_id, team_name, amount, version, committed_at=None):
+    """Starts the trace of a bid that just committed at state version; returns its trace id."""
+    trace = {
+        'id': uuid.uuid4().hex[:12],
+        'item_id': item_id,
+        'team': team_name,
+        'amount': amount,
+        'version': version,
+        'clicked': None,
+        'committed': committed_at or time.time(),
+        'snapshot': None,
+        'visible': {session_type: 0 for session_type in SESSION_TYPES},
+        'first_visible': None,
+    }
+    with _lock:
+        _traces.append(trace)
+    return trace['id']
+
+
+def clicked(trace_id, clicked_at, session_type):
+    """Attaches the button press to a committed bid's trace."""
+    with _lock:
+        trace = next((t for t in reversed(_traces) if t['id'] == trace_id), None)
+        if trace is None or trace['clicked'] is not None:
+            return
+        trace['clicked'] = clicked_at
+    seconds = max(0.0, trace['committed'] - clicked_at)
+    CLICK_TO_COMMIT.observe(seconds, session_type)
+    _sample("click_to_commit", session_type, seconds)
+
+
+def snapshot_built(version, built_at=None):
+    """A shared snapshot of version is ready: it includes every bid traced at or below it."""
+    built_at = built_at or time.time()
+    latencies = []
+    with _lock:
+        for trace in reversed(_traces):
+            if trace['version'] > version:
+                continue
+            if trace['snapshot'] is not None:
+                break
+            trace['snapshot'] = built_at
+            latencies.append(max(0.0, built_at - trace['committed']))
+    for seconds in latencies:
+        COMMIT_TO_SNAPSHOT.observe(seconds)
+        _sample("commit_to_snapshot", "all", seconds)
+
+
+def rendered(last_version, version, session_type):
+    """
+    A session built its live panel from the snapshot at version, having last shown
+    last_version (None for its first render, which records nothing). Records
+    commit->visible for the bids in between. Returns version, to pass back in as
+    last_version next time.
+    """
+    if last_version is None or version <= last_version:
+        return version if last_version is None else last_version
+    now = time.time()
+    latencies = []
+    with _lock:
+        for trace in reversed(_traces):
+            if trace['version'] <= last_version:
+                break
+            if trace['version'] > version:
+                continue
+            trace['visible'][session_type] += 1
+            if trace['first_visible'] is None:
+                trace['first_visible'] = now
+            latencies.append(max(0.0, now - trace['committed']))
+    for seconds in latencies:
+        COMMIT_TO_VISIBLE.observe(seconds, session_type)
+        _sample("commit_to_visible", session_type, seconds)
+    return version
+
+
+def reset():
+    with _lock:
+        _traces.clear()
+        _samples.clear()
+
+
+# ---------- REPORT ----------
+
+def _percentile(samples, q):
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+def report():
+    """Percentiles per stage and session type, over the last SAMPLES samples of each."""
+    with _lock:
+        by_key = {key: sorted(samples) for key, samples in _samples.items()}
+    rows = []
+    for (stage, session_type), samples in sorted(by_key.items()):
+        if not samples:
+            continue
+        rows.append({
+            'stage': stage,
+            'session_type': session_type,
+            'count': len(samples),
+            'p50_ms': round(_percentile(samples, 0.5) * 1000, 1),
+            'p90_ms': round(_percentile(samples, 0.9) * 1000, 1),
+            'p99_ms': round(_percentile(samples, 0.99) * 1000, 1),
+            'max_ms': round(samples[-1] * 1000, 1),
+        })
+    return rows
+
+
+def recent(limit=20):
+    """Newest traces first, with per-stage latencies in ms (None where a stage hasn't happened)."""
+    with _lock:
+        traces = [dict(t, visible=dict(t['visible'])) for t in list(_traces)[-limit:]]
+    ms = lambda start, end: None if start is None or end is None else round((end - start) * 1000, 1)
+    rows = []
+    for trace in reversed(traces):
+        rows.append({
+            'trace_id': trace['id'],
+            'item_id': trace['item_id'],
+            'team': trace['team'],
+            'amount': trace['amount'],
+            'click_to_commit_ms': ms(trace['clicked'], trace['committed']),
+            'commit_to_snapshot_ms': ms(trace['committed'], trace['snapshot']),
+            'commit_to_first_visible_ms': ms(trace['committed'], trace['first_visible']),
+            **{f'{session_type}_sessions': trace['visible'][session_type] for session_type in SESSION_TYPES},
+        })
+    return rows
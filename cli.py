@@ -0,0 +1,280 @@
+import argparse
+import os
+import sys
+from datetime import datetime
+
+import auction
+import db
+import player_import
+
+# Headless admin commands: the same operations as the admin sidebar, without
+# starting Streamlit. Run from the app directory, e.g.
+#
+#   python -m cli teams
+#   python -m cli import players.csv
+#   python -m cli activate "JASPRIT BUMRAH"
+#   python -m cli export --out exports/
+#
+# The database is players_game.db, or IBL_DB_PATH when set. A running app picks
+# the changes up on its next rerun (and its bid clock within a second).
+
+EXPORT_TABLES = ['items', 'teams', 'bids', 'sold_items', 'unsold_items']
+
+
+# ---------- HELPERS ----------
+
+class CommandError(Exception):
+    pass
+
+
+def find_item(ref):
+    """Resolves a player by id or by (case-insensitive) name; returns the id."""
+    c = db.get_read_cursor()
+    if ref.isdigit():
+        c.execute("SELECT id FROM items WHERE id = ?", (int(ref),))
+    else:
+        c.execute("SELECT id FROM items WHERE name = ? COLLATE NOCASE", (ref,))
+    rows = c.fetchall()
+    if not rows:
+        raise CommandError(f"No player matches '{ref}'.")
+    if len(rows) > 1:
+        raise CommandError(f"'{ref}' matches {len(rows)} players; use the id instead.")
+    return rows[0][0]
+
+
+def find_team(name):
+    c = db.get_read_cursor()
+    c.execute("SELECT name FROM teams WHERE name = ?", (name,))
+    if not c.fetchone():
+        raise CommandError(f"No team named '{name}'.")
+    return name
+
+
+def team_names():
+    c = db.get_read_cursor()
+    c.execute("SELECT name FROM teams")
+    return {row[0] for row in c.fetchall()}
+
+
+def player_values(row):
+    values, errors = player_import.validate_row(row, team_names())
+    if errors:
+        raise CommandError("; ".join(errors))
+    return values
+
+
+# ---------- COMMANDS ----------
+
+def cmd_players(args):
+    c = db.get_read_cursor()
+    c.execute("SELECT id, name, rating, category, nationality, base_price, previous_team, is_active, winner_team FROM items ORDER BY name")
+    for item_id, name, rating, category, nationality, base_price, previous_team, is_active, winner_team in c.fetchall():
+        status = "ACTIVE" if is_active else (winner_team or "")
+        print(f"{item_id:>5}  {name:<28} {rating:>3}  {category:<12} {nationality:<13} {auction.format_amount(base_price):>10}  {previous_team or '-':<6} {status}")
+
+
+def cmd_player_add(args):
+    values = player_values({
+        'name': args.name, 'rating': args.rating, 'category': args.category, 'nationality': args.nationality,
+        'base_price': args.base_price, 'image_url': args.image_url, 'previous_team': args.previous_team,
+    })
+    conn = db.get_connection()
+    conn.execute("INSERT INTO items (name, rating, category, nationality, image_url, base_price, previous_team) VALUES (?, ?, ?, ?, ?, ?, ?)", values)
+    conn.commit()
+    print(f"Added {values[0]} with base price of {auction.format_amount(values[5])}.")
+
+
+def cmd_player_update(args):
+    item_id = find_item(args.item)
+    c = db.get_read_cursor()
+    c.execute("SELECT name, rating, category, nationality, image_url, base_price, previous_team FROM items WHERE id = ?", (item_id,))
+    current = dict(zip(['name', 'rating', 'category', 'nationality', 'image_url', 'base_price', 'previous_team'], c.fetchone()))
+    for key in current:
+        if getattr(args, key) is not None:
+            current[key] = getattr(args, key)
+        elif current[key] is None:
+            current[key] = ""
+    values = player_values(current)
+    conn = db.get_connection()
+    conn.execute("UPDATE items SET name=?, rating=?, category=?, nationality=?, image_url=?, base_price=?, previous_team=? WHERE id=?", values + (item_id,))
+    conn.commit()
+    print(f"Updated {values[0]} (ID: {item_id}).")
+
+
+def cmd_player_delete(args):
+    item_id = find_item(args.item)
+    auction.delete_item(item_id)
+    print(f"Deleted player {item_id}.")
+
+
+def cmd_teams(args):
+    c = db.get_read_cursor()
+    c.execute("SELECT name, budget_remaining, initial_budget FROM teams ORDER BY name")
+    for name, budget, initial in c.fetchall():
+        print(f"{name:<8} {auction.format_amount(budget):>12} of {auction.format_amount(initial)}")
+
+
+def cmd_team_add(args):
+    conn = db.get_connection()
+    conn.execute("INSERT OR REPLACE INTO teams (name, budget_remaining, logo_url, initial_budget, password) VALUES (?, ?, ?, ?, ?)",
+                 (args.name, args.budget, args.logo_url, args.budget, args.password))
+    conn.commit()
+    print(f"Team '{args.name}' added/updated.")
+
+
+def cmd_team_update(args):
+    find_team(args.name)
+    updates = {'budget_remaining': args.budget, 'logo_url': args.logo_url, 'password': args.password}
+    updates = {column: value for column, value in updates.items() if value is not None}
+    if not updates:
+        raise CommandError("Nothing to update; pass --budget, --logo-url or --password.")
+    conn = db.get_connection()
+    conn.execute(f"UPDATE teams SET {', '.join(f'{column} = ?' for column in updates)} WHERE name = ?",
+                 list(updates.values()) + [args.name])
+    conn.commit()
+    print(f"Updated details for {args.name}.")
+
+
+def cmd_team_delete(args):
+    find_team(args.name)
+    conn = db.get_connection()
+    conn.execute("DELETE FROM teams WHERE name = ?", (args.name,))
+    conn.commit()
+    print(f"Deleted team {args.name}.")
+
+
+def cmd_activate(args):
+    item_id = find_item(args.item)
+    refund_msg = auction.set_active_item(item_id)
+    if refund_msg:
+        print(refund_msg)
+    print(f"Bidding started for player {item_id}.")
+
+
+def cmd_unsold(args):
+    item_id = find_item(args.item)
+    name = auction.mark_as_unsold(item_id)
+    print(f"{name} marked as UNSOLD.")
+
+
+def cmd_reset(args):
+    if not args.yes:
+        raise CommandError("This clears all bids and sales and restores every budget; rerun with --yes to confirm.")
+    if not auction.reset_all_data():
+        raise CommandError("Reset failed.")
+    print("All bids, sales and team budgets have been reset.")
+
+
+def cmd_export(args):
+    data = auction.export_all_data()
+    if data is None:
+        raise CommandError("Export failed.")
+    os.makedirs(args.out, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    for key in EXPORT_TABLES:
+        path = os.path.join(args.out, f"auction_{key}_{timestamp}.csv")
+        data[key].to_csv(path, index=False)
+        print(f"{path}  ({len(data[key])} rows)")
+
+
+def cmd_import(args):
+    with open(args.file, "rb") as f:
+        try:
+            report = player_import.import_players(f, args.file)
+        except ValueError as e:
+            raise CommandError(str(e))
+    for row_number, name, error in report['errors']:
+        print(f"row {row_number} ({name or '-'}): {error}", file=sys.stderr)
+    print(f"Imported {report['inserted']} new and updated {report['updated']} players from "
+          f"{report['rows']} rows in {report['seconds']:.2f}s; {len(report['errors'])} rows skipped.")
+    return 1 if report['errors'] else 0
+
+
+# ---------- ENTRY POINT ----------
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m cli", description="IBL auction admin commands.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("players", help="list players").set_defaults(func=cmd_players)
+
+    p = sub.add_parser("player-add", help="add a player")
+    p.add_argument("name")
+    p.add_argument("--rating", required=True)
+    p.add_argument("--category", required=True)
+    p.add_argument("--nationality", required=True)
+    p.add_argument("--base-price", required=True, help="in rupees, e.g. 2000000 or '20L' / '2 Cr'")
+    p.add_argument("--image-url", default="")
+    p.add_argument("--previous-team", default="")
+    p.set_defaults(func=cmd_player_add)
+
+    p = sub.add_parser("player-update", help="update a player's details")
+    p.add_argument("item", help="player id or name")
+    p.add_argument("--name")
+    p.add_argument("--rating")
+    p.add_argument("--category")
+    p.add_argument("--nationality")
+    p.add_argument("--base-price")
+    p.add_argument("--image-url")
+    p.add_argument("--previous-team", help="team name, or None to clear")
+    p.set_defaults(func=cmd_player_update)
+
+    p = sub.add_parser("player-delete", help="delete a player with their bids and results")
+    p.add_argument("item", help="player id or name")
+    p.set_defaults(func=cmd_player_delete)
+
+    sub.add_parser("teams", help="list teams and budgets").set_defaults(func=cmd_teams)
+
+    p = sub.add_parser("team-add", help="add (or replace) a team")
+    p.add_argument("name")
+    p.add_argument("--budget", type=int, required=True, help="initial budget in rupees")
+    p.add_argument("--password", required=True)
+    p.add_argument("--logo-url", default="")
+    p.set_defaults(func=cmd_team_add)
+
+    p = sub.add_parser("team-update", help="update a team's budget, logo or password")
+    p.add_argument("name")
+    p.add_argument("--budget", type=int, help="remaining budget in rupees")
+    p.add_argument("--logo-url")
+    p.add_argument("--password")
+    p.set_defaults(func=cmd_team_update)
+
+    p = sub.add_parser("team-delete", help="delete a team")
+    p.add_argument("name")
+    p.set_defaults(func=cmd_team_delete)
+
+    p = sub.add_parser("activate", help="start bidding on a player")
+    p.add_argument("item", help="player id or name")
+    p.set_defaults(func=cmd_activate)
+
+    p = sub.add_parser("unsold", help="mark a player as unsold")
+    p.add_argument("item", help="player id or name")
+    p.set_defaults(func=cmd_unsold)
+
+    p = sub.add_parser("reset", help="clear all bids and sales and restore budgets")
+    p.add_argument("--yes", action="store_true")
+    p.set_defaults(func=cmd_reset)
+
+    p = sub.add_parser("export", help="write every table to CSV")
+    p.add_argument("--out", default=".")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("import", help="bulk import players from CSV / Excel")
+    p.add_argument("file")
+    p.set_defaults(func=cmd_import)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    db.migrate()
+    try:
+        return args.func(args) or 0
+    except CommandError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
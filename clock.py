@@ -0,0 +1,81 @@
+import threading
+import time
+
+import auction
+from auction import STOP_PENDING
+
+# ---------- CONFIG ----------
+# Upper bound on how long the clock sleeps without re-reading the active item.
+# Bids and admin actions from other processes (e.g. the CLI) are picked up
+# within this interval; in-process callers can wake the clock with notify().
+MAX_SLEEP = 1.0
+
+
+class AuctionClock(threading.Thread):
+    """
+    Server-side auction timer. One instance per process owns the deadline of the
+    active lot, sleeps until exactly that moment and then acts on it once:
+
+    - while bidding is open the deadline is last_activity_timestamp +
+      timing_bid_duration, and the lot is closed via auction.expire_item();
+    - while an RTM decision is pending it is the decision's deadline
+      (rtm_decisions), and the lot goes to the highest bidder via
+      auction.expire_rtm().
+
+    Browsers see the outcome through the database like any other write, instead
+    of every connected session racing to do it on its next rerun.
+    """
+
+    def __init__(self):
+        super().__init__(name="auction-clock", daemon=True)
+        self._wakeup = threading.Condition()
+        self._stopped = False
+        self.deadline = None  # (item_id, epoch seconds) of the lot being timed
+
+    def notify(self):
+        """Wakes the clock so it re-reads the active item (new lot, new bid, RTM, settings change)."""
+        with self._wakeup:
+            self._wakeup.notify()
+
+    def stop(self):
+        self._stopped = True
+        self.notify()
+
+    def _tick(self):
+        """Handles the current lot; returns how long to sleep before the next check."""
+        active = auction.get_active_item()
+        if not active:
+            self.deadline = None
+            return MAX_SLEEP
+
+        item_id, last_activity_ts = active[0], active[12]
+        rtm = auction.get_pending_rtm(item_id)
+        if rtm:
+            deadline, expire = rtm['deadline'], auction.expire_rtm
+        else:
+            deadline, expire = (last_activity_ts or time.time()) + auction.get_bid_duration(), auction.expire_item
+        self.deadline = (item_id, deadline)
+        remaining = deadline - time.time()
+        if remaining > 0:
+            return min(remaining, MAX_SLEEP)
+
+        # The engine re-checks the deadline under its lock; a bid that landed since
+        # the read above comes back as STOP_PENDING with the time still left
+        result = expire(item_id)
+        if not result:
+            # Lot changed hands in the meantime; look again on the next interval
+            return MAX_SLEEP
+        if result['outcome'] == STOP_PENDING:
+            return min(result['remaining'], MAX_SLEEP)
+        return 0
+
+    def run(self):
+        while not self._stopped:
+            try:
+                delay = self._tick()
+            except Exception as e:
+                print(f"Auction clock error: {e}")
+                delay = MAX_SLEEP
+            if delay > 0:
+                with self._wakeup:
+                    self._wakeup.wait(timeout=delay)
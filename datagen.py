@@ -0,0 +1,265 @@
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+from datetime import datetime
+
+import db
+import settings
+from player_import import CATEGORIES, NATIONALITIES
+
+# Synthetic auction data for benchmarks and load tests. Writes a new database
+# with the app's schema (db.migrate) holding teams, players and an auction
+# already played out: bid ladders that follow the bidding tiers, sales within
+# budgets, squad and overseas limits, RTM sales within the RTM limits, and
+# unsold players. Seeded, so the same options always give the same database.
+#
+#   python -m datagen synthetic.db --players 5000 --teams 50 --bids 250000
+#
+# Sponsors are the defaults db.migrate seeds.
+
+# ---------- CONFIG ----------
+DEFAULTS = {
+    'players': 200,
+    'teams': 10,
+    'bids': 2000,                # target; budgets and limits can end ladders early
+    'seed': 1,
+    'auctioned': 0.6,            # share of players already put up for auction
+    'overseas_share': 0.3,
+    'previous_team_share': 0.3,  # players with an RTM-eligible previous team
+    'rtm_rate': 0.5,             # chance a previous team uses an available RTM
+    # Written to global_settings, and the limits the generated auction obeys
+    'max_squad_size': 25,
+    'max_overseas': 8,
+    'initial_purse': 1000000000,
+    'rtm_max_total': 2,
+    'rtm_max_indian': 1,
+    'rtm_max_overseas': 1,
+}
+SETTINGS_KEYS = ('max_squad_size', 'max_overseas', 'initial_purse', 'rtm_max_total', 'rtm_max_indian', 'rtm_max_overseas')
+
+CHUNK_SIZE = 50000               # bids per executemany
+START_TIME = datetime(2025, 3, 1, 18, 0).timestamp()
+LOT_GAP = (20, 90)               # seconds between the end of one lot and the first bid on the next
+BID_GAP = (1, 8)                 # seconds between bids on a lot
+
+CATEGORY_WEIGHTS = [35, 30, 25, 10]  # CATEGORIES order
+OVERSEAS = [n for n in NATIONALITIES if n not in ("India", "Other")]
+
+# Base price by rating: the first band whose minimum rating the player reaches
+BASE_PRICE_BANDS = [
+    (90, (20000000, 15000000)),
+    (80, (10000000, 7500000)),
+    (70, (5000000, 3000000)),
+    (60, (3000000, 2000000)),
+    (0, (2000000,)),
+]
+
+
+def _rating(rng):
+    return int(rng.triangular(30, 99, 62))
+
+
+def _base_price(rng, rating):
+    return rng.choice(next(prices for minimum, prices in BASE_PRICE_BANDS if rating >= minimum))
+
+
+def _demand(rating):
+    # Relative ladder length: a 90-rated player draws about 2.5x the bids of a 60
+    return (rating / 60) ** 2
+
+
+def _unsold_chance(rating):
+    return 0.03 if rating >= 70 else (75 - rating) / 100
+
+
+def _iso(ts):
+    return datetime.fromtimestamp(ts).isoformat()
+
+
+# ---------- GENERATOR ----------
+
+class _Team:
+    def __init__(self, name, purse):
+        self.name = name
+        self.budget = purse
+        self.squad = 0
+        self.overseas = 0
+        self.rtm = {'total': 0, 'indian': 0, 'overseas': 0}
+
+    def can_take(self, config, is_indian, amount):
+        return (self.budget >= amount and self.squad < config['max_squad_size']
+                and (is_indian or self.overseas < config['max_overseas']))
+
+    def rtm_available(self, config, is_indian):
+        return (self.rtm['total'] < config['rtm_max_total']
+                and self.rtm['indian' if is_indian else 'overseas'] < config['rtm_max_indian' if is_indian else 'rtm_max_overseas'])
+
+    def buy(self, is_indian, amount, is_rtm):
+        self.budget -= amount
+        self.squad += 1
+        self.overseas += not is_indian
+        if is_rtm:
+            self.rtm['total'] += 1
+            self.rtm['indian' if is_indian else 'overseas'] += 1
+
+
+def _bulk_load_bids(c, rows):
+    """Inserts bids without per-row triggers and index maintenance, then restores both."""
+    bid_indexes = [name for name, ddl in db.INDEXES.items() if " ON bids " in ddl]
+    for name in bid_indexes:
+        c.execute(f"DROP INDEX IF EXISTS {name}")
+    for event in ("insert", "update", "delete"):
+        c.execute(f"DROP TRIGGER IF EXISTS trg_bids_{event}_state_version")
+
+    count, chunk = 0, []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= CHUNK_SIZE:
+            c.executemany("INSERT INTO bids (item_id, team_name, amount, timestamp) VALUES (?, ?, ?, ?)", chunk)
+            count += len(chunk)
+            chunk = []
+    if chunk:
+        c.executemany("INSERT INTO bids (item_id, team_name, amount, timestamp) VALUES (?, ?, ?, ?)", chunk)
+        count += len(chunk)
+
+    for name in bid_indexes:
+        c.execute(db.INDEXES[name])
+    db._state_version_triggers(c, "bids")
+    c.execute("UPDATE auction_state SET version = version + 1 WHERE id = 1")
+    return count
+
+
+def generate(path, **options):
+    """
+    Creates the database at path (which must not exist) from DEFAULTS updated
+    with options. Returns a summary dict: players, teams, bids, sold, rtm,
+    unsold and seconds.
+    """
+    unknown = set(options) - set(DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown option(s): {', '.join(sorted(unknown))}")
+    if os.path.exists(path):
+        raise ValueError(f"{path} already exists.")
+    config = dict(DEFAULTS, **options)
+    rng = random.Random(config['seed'])
+    started = time.perf_counter()
+
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = OFF")  # a half-written file is thrown away anyway
+    db.migrate(conn)
+    with db.immediate_transaction(conn) as c:
+        c.executemany("INSERT OR REPLACE INTO global_settings (key, value) VALUES (?, ?)",
+                      [(key, str(config[key])) for key in SETTINGS_KEYS])
+        c.execute("SELECT key, value FROM global_settings")
+        rules = settings.AuctionSettings(c.fetchall())
+
+    teams = [_Team(f"T{i:03d}", config['initial_purse']) for i in range(1, config['teams'] + 1)]
+    by_name = {team.name: team for team in teams}
+
+    # Players: (id, name, rating, category, nationality, image_url, base_price, previous_team)
+    players = []
+    for i in range(1, config['players'] + 1):
+        rating = _rating(rng)
+        nationality = rng.choice(OVERSEAS) if rng.random() < config['overseas_share'] else "India"
+        previous_team = rng.choice(teams).name if teams and rng.random() < config['previous_team_share'] else None
+        players.append((i, f"Player {i:06d}", rating, rng.choices(CATEGORIES, CATEGORY_WEIGHTS)[0],
+                        nationality, "", _base_price(rng, rating), previous_team))
+
+    lots = rng.sample(players, int(len(players) * config['auctioned']))
+    # Spread the bid target over the lots expected to sell, weighted by rating
+    expected = sum(_demand(p[2]) * (1 - _unsold_chance(p[2])) for p in lots) or 1
+    bids_per_demand = config['bids'] / expected
+
+    outcome = {}  # player id -> (winner_team, current_bid, last_activity, unsold_timestamp)
+    sold_rows, unsold_rows = [], []
+    summary = {'players': len(players), 'teams': len(teams), 'bids': 0, 'sold': 0, 'rtm': 0, 'unsold': 0}
+    clock = [START_TIME]
+
+    def ladders():
+        for item_id, name, rating, category, nationality, _, base, previous_team in lots:
+            is_indian = nationality == "India"
+            clock[0] += rng.uniform(*LOT_GAP)
+            bidders = [t for t in teams if t.can_take(config, is_indian, base)]
+            if not bidders or rng.random() < _unsold_chance(rating):
+                outcome[item_id] = ('UNSOLD', base, 0, clock[0])
+                unsold_rows.append((name, rating, category, nationality, 'Unsold', _iso(clock[0])))
+                summary['unsold'] += 1
+                continue
+
+            bidders = rng.sample(bidders, min(len(bidders), rng.randint(2, 4)))
+            length = max(1, round(rng.expovariate(1 / (bids_per_demand * _demand(rating)))))
+            top, amount = rng.choice(bidders), base
+            yield (item_id, top.name, amount, _iso(clock[0]))
+            for _ in range(length - 1):
+                next_amount = amount + rules.bid_increment(amount)
+                rivals = [t for t in bidders if t is not top and t.budget >= next_amount]
+                if not rivals:
+                    break
+                top, amount = rng.choice(rivals), next_amount
+                clock[0] += rng.uniform(*BID_GAP)
+                yield (item_id, top.name, amount, _iso(clock[0]))
+
+            winner, is_rtm = top, False
+            holder = by_name.get(previous_team)
+            if (holder and holder is not top and rules.rtm_option and holder.rtm_available(config, is_indian)
+                    and holder.can_take(config, is_indian, amount) and rng.random() < config['rtm_rate']):
+                winner, is_rtm = holder, True
+            winner.buy(is_indian, amount, is_rtm)
+            outcome[item_id] = (winner.name, amount, clock[0], 0)
+            sold_rows.append((name, amount, rating, category, nationality, winner.name, _iso(clock[0] + 5), int(is_rtm)))
+            summary['sold'] += 1
+            summary['rtm'] += is_rtm
+
+    with db.immediate_transaction(conn) as c:
+        summary['bids'] = _bulk_load_bids(c, ladders())
+        c.executemany("INSERT INTO teams (name, budget_remaining, logo_url, initial_budget, password) VALUES (?, ?, '', ?, ?)",
+                      [(t.name, t.budget, config['initial_purse'], t.name.lower()) for t in teams])
+        c.executemany("INSERT INTO items (id, name, rating, category, nationality, image_url, base_price, previous_team, "
+                      "winner_team, current_bid, last_activity_timestamp, unsold_timestamp) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                      [p + outcome.get(p[0], (None, p[6], 0, 0)) for p in players])
+        c.executemany("INSERT INTO sold_items (item_name, sold_amount, rating, category, nationality, team_bought, timestamp, is_rtm) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                      sold_rows)
+        c.executemany("INSERT INTO unsold_items (item_name, rating, category, nationality, status, timestamp) VALUES (?, ?, ?, ?, ?, ?)",
+                      unsold_rows)
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.close()
+
+    summary['seconds'] = time.perf_counter() - started
+    return summary
+
+
+# ---------- ENTRY POINT ----------
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m datagen", description="Generate a synthetic IBL auction database.")
+    parser.add_argument("path", help="database file to create")
+    for key, default in DEFAULTS.items():
+        kind = float if isinstance(default, float) else int
+        parser.add_argument(f"--{key.replace('_', '-')}", type=kind, default=default, dest=key)
+    parser.add_argument("--force", action="store_true", help="replace path if it exists")
+    return parser
+
+
+def main(argv=None):
+    args = vars(build_parser().parse_args(argv))
+    path, force = args.pop("path"), args.pop("force")
+    if force:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+    try:
+        summary = generate(path, **args)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,568 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import metrics
+import profiler
+
+# ---------- CONFIG ----------
+DB_PATH = os.environ.get("IBL_DB_PATH", "players_game.db")
+BUSY_TIMEOUT_MS = 5000
+MAX_IDLE_CONNECTIONS = 32
+
+
+# ---------- CONNECTION POOL ----------
+class ConnectionPool:
+    """
+    Hands every thread its own SQLite connection and cursor.
+
+    Streamlit runs each browser session on its own script thread, so sharing one
+    connection serializes all sessions behind a single cursor. Connections owned
+    by threads that have exited are reclaimed on the next checkout and reused.
+    With read_only=True the connections are opened with mode=ro, so under WAL any
+    number of viewers can read in parallel with the writer.
+    """
+
+    def __init__(self, path, read_only=False, max_idle=MAX_IDLE_CONNECTIONS):
+        self.path = path
+        self.read_only = read_only
+        self.max_idle = max_idle
+        self._lock = threading.Lock()
+        self._idle = []
+        self._by_thread = {}  # thread ident -> (connection, cursor)
+
+    def _connect(self):
+        if self.read_only:
+            conn = sqlite3.connect(f"{Path(self.path).resolve().as_uri()}?mode=ro", uri=True, check_same_thread=False)
+            conn.execute("PRAGMA query_only = 1")
+        else:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        return conn
+
+    def _reclaim_dead_threads(self):
+        # Must be called with self._lock held
+        alive = {t.ident for t in threading.enumerate()}
+        for ident in [i for i in self._by_thread if i not in alive]:
+            self._checkin(self._by_thread.pop(ident)[0])
+
+    def _checkin(self, conn):
+        # Must be called with self._lock held
+        if conn.in_transaction:
+            conn.rollback()
+        if len(self._idle) < self.max_idle:
+            self._idle.append(conn)
+        else:
+            conn.close()
+
+    def _checkout(self):
+        ident = threading.get_ident()
+        entry = self._by_thread.get(ident)
+        if entry is None:
+            with self._lock:
+                self._reclaim_dead_threads()
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                conn = self._connect()
+            entry = (conn, conn.cursor())
+            with self._lock:
+                self._by_thread[ident] = entry
+        return entry
+
+    def connection(self):
+        """Returns the calling thread's connection."""
+        return self._checkout()[0]
+
+    def cursor(self):
+        """Returns the calling thread's cursor (one per thread, reused across calls)."""
+        return self._checkout()[1]
+
+    def release(self):
+        """Returns the calling thread's connection to the idle list."""
+        with self._lock:
+            entry = self._by_thread.pop(threading.get_ident(), None)
+            if entry:
+                self._checkin(entry[0])
+
+    def close_all(self):
+        with self._lock:
+            for conn, _ in self._by_thread.values():
+                conn.close()
+            for conn in self._idle:
+                conn.close()
+            self._by_thread.clear()
+            self._idle.clear()
+
+
+writer_pool = ConnectionPool(DB_PATH)
+reader_pool = ConnectionPool(DB_PATH, read_only=True)
+
+
+def get_connection():
+    """Read/write connection for the calling thread."""
+    return writer_pool.connection()
+
+
+def get_cursor():
+    """Read/write cursor for the calling thread (profiled while profiler.enabled)."""
+    return profiler.wrap(writer_pool.cursor())
+
+
+def get_read_cursor():
+    """Read-only cursor for the calling thread (viewer traffic)."""
+    return profiler.wrap(reader_pool.cursor())
+
+
+@contextmanager
+def immediate_transaction(conn=None):
+    """
+    Runs the block inside BEGIN IMMEDIATE, so the write lock is taken up front and
+    every read inside the block sees the state the writes will be applied to.
+    Commits on success, rolls back on any exception. Yields a cursor.
+    """
+    conn = conn or get_connection()
+    if conn.in_transaction:
+        # Flush any implicit transaction left open by a plain execute()
+        conn.commit()
+    started = time.perf_counter()
+    conn.execute("BEGIN IMMEDIATE")
+    metrics.record_lock_wait(time.perf_counter() - started)
+    try:
+        yield profiler.wrap(conn.cursor())
+    except BaseException:
+        conn.rollback()
+        raise
+    else:
+        conn.commit()
+
+
+# ---------- SCHEMA MIGRATIONS ----------
+# Each migration brings the schema from version N-1 to N. The applied version is
+# stored in PRAGMA user_version, so steady-state startups do no DDL at all.
+
+def _migration_1_base_schema(c):
+    """Base schema. Idempotent, so it also adopts databases created before versioning."""
+    # Create tables
+    c.execute('''CREATE TABLE IF NOT EXISTS items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        rating INTEGER,
+        category TEXT,
+        nationality TEXT,
+        image_url TEXT,
+        base_price INTEGER,
+        current_bid INTEGER DEFAULT 0,
+        is_active INTEGER DEFAULT 0,
+        winner_team TEXT DEFAULT NULL,
+        unsold_timestamp REAL DEFAULT 0
+    )''')
+
+    c.execute('''CREATE TABLE IF NOT EXISTS bids (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        item_id INTEGER,
+        team_name TEXT,
+        amount INTEGER,
+        timestamp TEXT
+    )''')
+
+    # Create teams table with password column
+    c.execute('''CREATE TABLE IF NOT EXISTS teams (
+        name TEXT PRIMARY KEY,
+        budget_remaining INTEGER,
+        logo_url TEXT,
+        initial_budget INTEGER,
+        password TEXT NOT NULL
+    )''')
+
+    # Add password column if it doesn't exist
+    try:
+        c.execute("ALTER TABLE teams ADD COLUMN password TEXT NOT NULL DEFAULT ''")
+    except sqlite3.OperationalError:
+        # Handle the case where the column already exists or other errors
+        pass
+
+    # Check if unsold_timestamp column exists
+    try:
+        c.execute("SELECT unsold_timestamp FROM items LIMIT 1")
+    except sqlite3.OperationalError:
+        # Column doesn't exist, add it
+        c.execute("ALTER TABLE items ADD COLUMN unsold_timestamp REAL DEFAULT 0")
+
+    # Check if current_bid column exists
+    try:
+        c.execute("SELECT current_bid FROM items LIMIT 1")
+    except sqlite3.OperationalError:
+        # Column doesn't exist, add it
+        c.execute("ALTER TABLE items ADD COLUMN current_bid INTEGER DEFAULT 0")
+
+    # Check if previous_team column exists (for RTM)
+    try:
+        c.execute("SELECT previous_team FROM items LIMIT 1")
+    except sqlite3.OperationalError:
+        # Column doesn't exist, add it
+        c.execute("ALTER TABLE items ADD COLUMN previous_team TEXT DEFAULT NULL")
+
+    # Check if last_activity_timestamp column exists
+    try:
+        c.execute("SELECT last_activity_timestamp FROM items LIMIT 1")
+    except sqlite3.OperationalError:
+        c.execute("ALTER TABLE items ADD COLUMN last_activity_timestamp REAL DEFAULT 0")
+
+    # Create sold_items table
+    c.execute('''CREATE TABLE IF NOT EXISTS sold_items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        item_name TEXT NOT NULL,
+        sold_amount INTEGER,
+        rating INTEGER,
+        category TEXT,
+        nationality TEXT,
+        team_bought TEXT,
+        timestamp TEXT
+    )''')
+
+    # Create unsold_items table
+    c.execute('''CREATE TABLE IF NOT EXISTS unsold_items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        item_name TEXT NOT NULL,
+        rating INTEGER,
+        category TEXT,
+        nationality TEXT,
+        status TEXT,
+        timestamp TEXT
+    )''')
+
+    # Create sponsors table
+    c.execute('''CREATE TABLE IF NOT EXISTS sponsors (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        logo_url TEXT NOT NULL
+    )''')
+
+    # Check if is_rtm column exists (Robust)
+    try:
+        c.execute("ALTER TABLE sold_items ADD COLUMN is_rtm INTEGER DEFAULT 0")
+    except sqlite3.OperationalError:
+        # Likely column already exists
+        pass
+
+    # Create global_settings table
+    c.execute('''CREATE TABLE IF NOT EXISTS global_settings (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    )''')
+
+    # Initialize global settings if empty
+    c.execute("SELECT COUNT(*) FROM global_settings")
+    if c.fetchone()[0] == 0:
+        default_tiers = [
+            {"limit": 10000000, "increment": 500000},    # 1Cr, 5L
+            {"limit": 20000000, "increment": 1000000},   # 2Cr, 10L
+            {"limit": 50000000, "increment": 2500000},   # 5Cr, 25L
+            {"limit": 100000000, "increment": 5000000},  # 10Cr, 50L
+            {"limit": 9990000000, "increment": 10000000} # 999Cr, 1Cr
+        ]
+
+        settings_defaults = {
+            "max_squad_size": "25",
+            "min_squad_size": "18",
+            "max_overseas": "8",
+            "initial_purse": "1000000000", # 100 Cr
+            "bidding_tiers": json.dumps(default_tiers),
+            "timing_bid_duration": "60",
+            "timing_rtm_decision": "30",
+            "timing_auto_break": "300",
+            "rtm_max_total": "2",
+            "rtm_max_indian": "1",
+            "rtm_max_overseas": "1",
+            "rtm_option": "true"
+        }
+
+        for key, val in settings_defaults.items():
+            c.execute("INSERT OR IGNORE INTO global_settings (key, value) VALUES (?, ?)", (key, val))
+
+    # Check if sponsors table is empty and populate it if needed
+    c.execute("SELECT COUNT(*) FROM sponsors")
+    if c.fetchone()[0] == 0:
+        initial_sponsors = [
+            {"name": "Jio", "logo": "https://upload.wikimedia.org/wikipedia/commons/thumb/5/50/Reliance_Jio_Logo_%28October_2015%29.svg/500px-Reliance_Jio_Logo_%28October_2015%29.svg.png"},
+            {"name": "Mobil", "logo": "https://images.seeklogo.com/logo-png/30/1/mobil-logo-png_seeklogo-302049.png"},
+            {"name": "Gemini", "logo": "https://upload.wikimedia.org/wikipedia/commons/thumb/8/8a/Google_Gemini_logo.svg/500px-Google_Gemini_logo.svg.png"},
+            {"name": "vivo", "logo": "https://upload.wikimedia.org/wikipedia/commons/thumb/e/e5/Vivo_mobile_logo.png/500px-Vivo_mobile_logo.png"},
+            {"name": "Castrol", "logo": "https://upload.wikimedia.org/wikipedia/commons/thumb/4/40/Castrol_logo_2023.svg/1200px-Castrol_logo_2023.svg.png"},
+            {"name": "Nike", "logo": "https://upload.wikimedia.org/wikipedia/commons/thumb/a/a6/Logo_NIKE.svg/500px-Logo_NIKE.svg.png"},
+            {"name": "EA", "logo": "https://upload.wikimedia.org/wikipedia/commons/thumb/0/0d/Electronic-Arts-Logo.svg/500px-Electronic-Arts-Logo.svg.png"},
+            {"name": "adda52", "logo": "https://mma.prnewswire.com/media/543915/Adda52_Rummy_Logo.jpg?p=facebook"},
+            {"name": "Unilever", "logo": "https://cdn-icons-png.flaticon.com/512/5977/5977593.png"},
+            {"name": "Pepsi", "logo": "https://upload.wikimedia.org/wikipedia/commons/thumb/0/0f/Pepsi_logo_2014.svg/500px-Pepsi_logo_2014.svg.png"},
+            {"name": "Coca-Cola", "logo": "https://upload.wikimedia.org/wikipedia/commons/thumb/c/ce/Coca-Cola_logo.svg/500px-Coca-Cola_logo.svg.png"},
+            {"name": "Adidas", "logo": "https://upload.wikimedia.org/wikipedia/commons/thumb/2/20/Adidas_Logo.svg/500px-Adidas_Logo.svg.png"},
+            {"name": "Samsung", "logo": "https://upload.wikimedia.org/wikipedia/commons/thumb/6/61/Samsung_old_logo_before_year_2015.svg/2560px-Samsung_old_logo_before_year_2015.svg.png"},
+            {"name": "Microsoft", "logo": "https://upload.wikimedia.org/wikipedia/commons/thumb/9/96/Microsoft_logo_%282012%29.svg/500px-Microsoft_logo_%282012%29.svg.png"},
+            {"name": "Amazon", "logo": "https://upload.wikimedia.org/wikipedia/commons/thumb/a/a9/Amazon_logo.svg/500px-Amazon_logo.svg.png"},
+        ]
+        for sponsor in initial_sponsors:
+            c.execute("INSERT INTO sponsors (name, logo_url) VALUES (?, ?)", (sponsor["name"], sponsor["logo"]))
+
+    # Ensure system images exist (run this outside the empty check)
+    system_sponsors = [
+        ("No Bidding Placeholder", "https://i.postimg.cc/rm46tZSY/Untitled-design-(2).gif"),
+        ("Title Sponsor", "https://i.postimg.cc/sx5jPgR3/TITLE-SPONSOR.png")
+    ]
+
+    for name, url in system_sponsors:
+        c.execute("SELECT count(*) FROM sponsors WHERE name = ?", (name,))
+        if c.fetchone()[0] == 0:
+            c.execute("INSERT INTO sponsors (name, logo_url) VALUES (?, ?)", (name, url))
+
+
+# Secondary indexes for the queries that run on every rerun. Keyed by name so the
+# set can be inspected (see explain_hot_queries) and extended by later migrations.
+INDEXES = {
+    # get_highest_bid / MAX(amount) / COUNT(*) per item, covering (team_name included)
+    "idx_bids_item_amount": "CREATE INDEX IF NOT EXISTS idx_bids_item_amount ON bids (item_id, amount DESC, team_name)",
+    # Recent bids panel for the active item
+    "idx_bids_item_timestamp": "CREATE INDEX IF NOT EXISTS idx_bids_item_timestamp ON bids (item_id, timestamp)",
+    # get_active_item: at most one row ever matches, so a partial index stays tiny
+    "idx_items_active": "CREATE INDEX IF NOT EXISTS idx_items_active ON items (is_active) WHERE is_active = 1",
+    "idx_items_winner_team": "CREATE INDEX IF NOT EXISTS idx_items_winner_team ON items (winner_team, rating)",
+    "idx_items_name": "CREATE INDEX IF NOT EXISTS idx_items_name ON items (name)",
+    "idx_items_unsold_timestamp": "CREATE INDEX IF NOT EXISTS idx_items_unsold_timestamp ON items (unsold_timestamp)",
+    # Deletes by name, squad join and get_sold_amount (covering)
+    "idx_sold_items_item_name": "CREATE INDEX IF NOT EXISTS idx_sold_items_item_name ON sold_items (item_name, sold_amount, is_rtm)",
+    "idx_sold_items_timestamp": "CREATE INDEX IF NOT EXISTS idx_sold_items_timestamp ON sold_items (timestamp)",
+    # get_rtm_stats (covering)
+    "idx_sold_items_team_rtm": "CREATE INDEX IF NOT EXISTS idx_sold_items_team_rtm ON sold_items (team_bought, is_rtm, nationality)",
+    "idx_unsold_items_item_name": "CREATE INDEX IF NOT EXISTS idx_unsold_items_item_name ON unsold_items (item_name)",
+    "idx_unsold_items_timestamp": "CREATE INDEX IF NOT EXISTS idx_unsold_items_timestamp ON unsold_items (timestamp)",
+}
+
+
+def _migration_2_hot_query_indexes(c):
+    """Indexes backing the per-rerun auction queries."""
+    for ddl in INDEXES.values():
+        c.execute(ddl)
+
+
+# Every table whose contents show up on screen. Any insert/update/delete on them
+# bumps auction_state.version, so "has anything changed?" is one primary-key lookup.
+# Tables added by later migrations get the same triggers there (rtm_decisions).
+VERSIONED_TABLES = ("items", "bids", "sold_items", "unsold_items", "teams", "sponsors", "global_settings")
+
+
+def _migration_3_state_version(c):
+    """Single-row auction_state table holding a monotonically increasing state version."""
+    c.execute('''CREATE TABLE IF NOT EXISTS auction_state (
+                 id INTEGER PRIMARY KEY CHECK (id = 1),
+                 version INTEGER NOT NULL DEFAULT 0)''')
+    c.execute("INSERT OR IGNORE INTO auction_state (id, version) VALUES (1, 0)")
+
+    # Bumped by triggers rather than by each write path, so admin edits, the
+    # clock thread and anything added later can't forget to do it. The bump
+    # commits (or rolls back) together with the write that caused it.
+    for table in VERSIONED_TABLES:
+        _state_version_triggers(c, table)
+
+
+def _state_version_triggers(c, table):
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        c.execute(f'''CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()}_state_version
+                      AFTER {event} ON {table}
+                      BEGIN
+                          UPDATE auction_state SET version = version + 1 WHERE id = 1;
+                      END''')
+
+
+# Per-team ledger columns and the contribution one row makes to them.
+# Squad columns follow items.winner_team, sale columns follow sold_items.team_bought.
+def _squad_delta(row, sign):
+    return f"""players = players {sign} 1,
+               rating_sum = rating_sum {sign} COALESCE({row}.rating, 0),
+               batsmen = batsmen {sign} ({row}.category IS 'Batsman'),
+               bowlers = bowlers {sign} ({row}.category IS 'Bowler'),
+               allrounders = allrounders {sign} ({row}.category IS 'Allrounder'),
+               wicketkeepers = wicketkeepers {sign} ({row}.category IS 'Wicketkeeper'),
+               indian = indian {sign} ({row}.nationality IS 'India'),
+               overseas = overseas {sign} ({row}.nationality IS NOT 'India')"""
+
+
+def _sale_delta(row, sign):
+    return f"""spent = spent {sign} COALESCE({row}.sold_amount, 0),
+               rtm_total = rtm_total {sign} ({row}.is_rtm IS 1),
+               rtm_indian = rtm_indian {sign} ({row}.is_rtm IS 1 AND {row}.nationality IS 'India'),
+               rtm_overseas = rtm_overseas {sign} ({row}.is_rtm IS 1 AND {row}.nationality IS NOT 'India')"""
+
+
+def _ledger_triggers(table, team_column, delta, watched_columns):
+    # 'UNSOLD' is a lot outcome stored in the same column, not a team
+    new_team = f"NEW.{team_column} IS NOT NULL AND NEW.{team_column} != 'UNSOLD'"
+    old_team = f"OLD.{team_column} IS NOT NULL AND OLD.{team_column} != 'UNSOLD'"
+    ensure = f"INSERT OR IGNORE INTO team_stats (team_name) SELECT NEW.{team_column} WHERE {new_team};"
+    add = f"UPDATE team_stats SET {delta('NEW', '+')} WHERE team_name = NEW.{team_column};"
+    remove = f"UPDATE team_stats SET {delta('OLD', '-')} WHERE team_name = OLD.{team_column};"
+    return [
+        f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_insert_team_stats
+            AFTER INSERT ON {table} WHEN {new_team}
+            BEGIN {ensure} {add} END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_delete_team_stats
+            AFTER DELETE ON {table} WHEN {old_team}
+            BEGIN {remove} END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_update_team_stats
+            AFTER UPDATE OF {', '.join(watched_columns)} ON {table}
+            WHEN ({old_team}) OR ({new_team})
+            BEGIN {remove} {ensure} {add} END""",
+    ]
+
+
+def _team_stats_triggers():
+    return (_ledger_triggers("items", "winner_team", _squad_delta, ("winner_team", "rating", "category", "nationality"))
+            + _ledger_triggers("sold_items", "team_bought", _sale_delta, ("team_bought", "sold_amount", "is_rtm", "nationality")))
+
+
+def _migration_4_team_stats(c):
+    """
+    team_stats ledger: squad size, rating sum, category / nationality counts,
+    money spent and RTMs used per team, so squad and RTM reads are one-row lookups.
+    """
+    c.execute('''CREATE TABLE IF NOT EXISTS team_stats (
+                 team_name TEXT PRIMARY KEY NOT NULL,
+                 players INTEGER NOT NULL DEFAULT 0,
+                 rating_sum INTEGER NOT NULL DEFAULT 0,
+                 batsmen INTEGER NOT NULL DEFAULT 0,
+                 bowlers INTEGER NOT NULL DEFAULT 0,
+                 allrounders INTEGER NOT NULL DEFAULT 0,
+                 wicketkeepers INTEGER NOT NULL DEFAULT 0,
+                 indian INTEGER NOT NULL DEFAULT 0,
+                 overseas INTEGER NOT NULL DEFAULT 0,
+                 spent INTEGER NOT NULL DEFAULT 0,
+                 rtm_total INTEGER NOT NULL DEFAULT 0,
+                 rtm_indian INTEGER NOT NULL DEFAULT 0,
+                 rtm_overseas INTEGER NOT NULL DEFAULT 0)''')
+
+    # Kept up to date by triggers, inside the same transaction as the sale, the
+    # set_active_item refund, delete_item, unsold marking, admin edits and resets.
+    for ddl in _team_stats_triggers():
+        c.execute(ddl)
+
+    # Backfill from the existing auction
+    c.execute("DELETE FROM team_stats")
+    c.execute('''INSERT INTO team_stats (team_name, players, rating_sum, batsmen, bowlers, allrounders, wicketkeepers, indian, overseas)
+                 SELECT winner_team, COUNT(*), SUM(COALESCE(rating, 0)),
+                        SUM(category IS 'Batsman'), SUM(category IS 'Bowler'),
+                        SUM(category IS 'Allrounder'), SUM(category IS 'Wicketkeeper'),
+                        SUM(nationality IS 'India'), SUM(nationality IS NOT 'India')
+                 FROM items WHERE winner_team IS NOT NULL AND winner_team != 'UNSOLD' GROUP BY winner_team''')
+    c.execute("INSERT OR IGNORE INTO team_stats (team_name) SELECT DISTINCT team_bought FROM sold_items WHERE team_bought IS NOT NULL")
+    c.execute('''UPDATE team_stats SET
+                 spent = (SELECT COALESCE(SUM(sold_amount), 0) FROM sold_items WHERE team_bought = team_name),
+                 rtm_total = (SELECT COUNT(*) FROM sold_items WHERE team_bought = team_name AND is_rtm = 1),
+                 rtm_indian = (SELECT COUNT(*) FROM sold_items WHERE team_bought = team_name AND is_rtm = 1 AND nationality IS 'India'),
+                 rtm_overseas = (SELECT COUNT(*) FROM sold_items WHERE team_bought = team_name AND is_rtm = 1 AND nationality IS NOT 'India')''')
+
+
+def _migration_5_rtm_decisions(c):
+    """
+    Pending Right-to-Match decisions, one row per lot, written when bidding stops
+    into an RTM and removed when the lot is sold, marked unsold or restarted.
+    deadline (epoch seconds) is when the clock sells to the highest bidder.
+    """
+    c.execute('''CREATE TABLE IF NOT EXISTS rtm_decisions (
+                 item_id INTEGER PRIMARY KEY,
+                 prev_team TEXT NOT NULL,
+                 bidder TEXT NOT NULL,
+                 amount INTEGER NOT NULL,
+                 started_at REAL NOT NULL,
+                 deadline REAL NOT NULL)''')
+    # On screen like everything else, so it bumps state_version too
+    _state_version_triggers(c, "rtm_decisions")
+
+
+def _migration_6_team_stats_skip_unsold(c):
+    """
+    Recreates the team_stats triggers so lots marked 'UNSOLD' don't count as a
+    team, and drops the 'UNSOLD' row the earlier triggers and backfill created.
+    """
+    for table in ("items", "sold_items"):
+        for event in ("insert", "delete", "update"):
+            c.execute(f"DROP TRIGGER IF EXISTS trg_{table}_{event}_team_stats")
+    for ddl in _team_stats_triggers():
+        c.execute(ddl)
+    c.execute("DELETE FROM team_stats WHERE team_name = 'UNSOLD'")
+
+
+MIGRATIONS = [
+    _migration_1_base_schema,
+    _migration_2_hot_query_indexes,
+    _migration_3_state_version,
+    _migration_4_team_stats,
+    _migration_5_rtm_decisions,
+    _migration_6_team_stats_skip_unsold,
+]
+
+
+# ---------- QUERY PLAN CHECK ----------
+# The queries that run on every rerun, with representative parameters
+HOT_QUERIES = {
+    "state_version": ("SELECT version FROM auction_state WHERE id = 1", ()),
+    "get_active_item": ("SELECT id, name, rating, category, nationality, image_url, base_price, current_bid, is_active, winner_team, unsold_timestamp, previous_team, last_activity_timestamp FROM items WHERE is_active = 1 LIMIT 1", ()),
+    "get_highest_bid": ("SELECT team_name, amount FROM bids WHERE item_id = ? ORDER BY amount DESC LIMIT 1", (1,)),
+    "bid_count": ("SELECT COUNT(*) FROM bids WHERE item_id = ?", (1,)),
+    "resume_bid": ("SELECT MAX(amount) FROM bids WHERE item_id = ?", (1,)),
+    "recent_bids": ("SELECT team_name, amount, timestamp FROM bids WHERE item_id = ? ORDER BY timestamp DESC LIMIT 3", (1,)),
+    "delete_sold_by_name": ("DELETE FROM sold_items WHERE item_name = ?", ("",)),
+    "delete_unsold_by_name": ("DELETE FROM unsold_items WHERE item_name = ?", ("",)),
+    "get_sold_amount": ("SELECT sold_amount FROM sold_items WHERE item_name = ?", ("",)),
+    "squad_join": ("SELECT i.name, i.rating, i.category, i.nationality, s.sold_amount, s.is_rtm FROM items i LEFT JOIN sold_items s ON i.name = s.item_name WHERE i.winner_team = ?", ("",)),
+    "team_stats": ("SELECT spent, rating_sum, batsmen, bowlers, allrounders, wicketkeepers, indian, overseas, players FROM team_stats WHERE team_name = ?", ("",)),
+    "rtm_stats": ("SELECT rtm_total, rtm_indian, rtm_overseas FROM team_stats WHERE team_name = ?", ("",)),
+    "recent_sold": ("SELECT item_name, sold_amount, team_bought, timestamp FROM sold_items ORDER BY timestamp DESC LIMIT 2", ()),
+    "recently_unsold_item": ("SELECT id FROM items WHERE is_active = 0 AND unsold_timestamp > ? LIMIT 1", (0,)),
+    "item_by_name": ("SELECT id FROM items WHERE name = ?", ("",)),
+    "pending_rtm": ("SELECT item_id, prev_team, bidder, amount, started_at, deadline FROM rtm_decisions WHERE item_id = ?", (1,)),
+}
+
+
+def explain_hot_queries(conn=None):
+    """
+    Runs EXPLAIN QUERY PLAN for every entry in HOT_QUERIES.
+    Returns {name: (index_backed, [plan lines])}; a query counts as index-backed
+    when no step is a full table scan.
+    """
+    conn = conn or get_connection()
+    report = {}
+    for name, (sql, params) in HOT_QUERIES.items():
+        plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()]
+        full_scans = [step for step in plan if step.startswith("SCAN ") and " USING " not in step]
+        report[name] = (not full_scans, plan)
+    return report
+
+
+def schema_version(conn=None):
+    conn = conn or get_connection()
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn=None):
+    """
+    Applies any pending migrations, each in its own write transaction.
+    Safe to call from several processes: the version is re-read after taking the write lock.
+    Returns the number of migrations applied.
+    """
+    conn = conn or get_connection()
+    if schema_version(conn) >= len(MIGRATIONS):
+        return 0
+
+    applied = 0
+    for version, migration in enumerate(MIGRATIONS, start=1):
+        with immediate_transaction(conn) as c:
+            if schema_version(conn) >= version:
+                continue
+            migration(c)
+            c.execute(f"PRAGMA user_version = {version}")
+            applied += 1
+    return applied
@@ -0,0 +1,466 @@
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import bidtrace
+import db
+import metrics
+import settings
+
+# Bidding core. Holds the hot auction state in memory and writes every change
+# straight through to SQLite; auction.py's place_bid / attempt_stop_bidding /
+# finalize_item_sale / expire_item / check_rtm_eligibility delegate here.
+
+# place_bid() outcomes
+BID_ACCEPTED = "accepted"
+BID_STALE = "stale"
+BID_INSUFFICIENT_BUDGET = "insufficient_budget"
+BID_CLOSED = "closed"
+
+# stop_bidding() / expire() outcomes
+STOP_SOLD = "sold"
+STOP_UNSOLD = "unsold"
+STOP_RTM = "rtm"
+# expire() / expire_rtm() outcome when the deadline hasn't passed yet
+STOP_PENDING = "pending"
+# resolve_rtm() outcome when the decision was already taken or timed out
+RTM_DECISION_CLOSED = "decision_closed"
+
+# Same columns (and order) as auction.get_active_item()
+ITEM_COLUMNS = "id, name, rating, category, nationality, image_url, base_price, current_bid, is_active, winner_team, unsold_timestamp, previous_team, last_activity_timestamp"
+CURRENT_BID, NATIONALITY, PREVIOUS_TEAM, LAST_ACTIVITY = 7, 4, 11, 12
+
+RTM_COLUMNS = "item_id, prev_team, bidder, amount, started_at, deadline"
+
+
+def rtm_state(row):
+    """rtm_decisions row -> the rtm_state dict the UI works with (None for no row)."""
+    if not row:
+        return None
+    item_id, prev_team, bidder, amount, started_at, deadline = row
+    return {'active': True, 'item_id': item_id, 'prev_team': prev_team, 'bidder': bidder,
+            'amount': amount, 'timestamp': started_at, 'deadline': deadline}
+
+
+# ---------- REPOSITORY ----------
+
+class SQLiteRepository:
+    """
+    Write-through persistence for AuctionEngine. Write methods run on the cursor
+    of an open transaction(), so the engine can put a whole operation, and the
+    version read that follows it, into one BEGIN IMMEDIATE.
+    """
+
+    def transaction(self):
+        return db.immediate_transaction()
+
+    def read_cursor(self):
+        return db.get_read_cursor()
+
+    def version(self, c):
+        c.execute("SELECT version FROM auction_state WHERE id = 1")
+        row = c.fetchone()
+        return row[0] if row else 0
+
+    def load(self, c):
+        """Hot state as seen by the cursor's transaction."""
+        c.execute(f"SELECT {ITEM_COLUMNS} FROM items WHERE is_active = 1 LIMIT 1")
+        active = c.fetchone()
+        top_bid = rtm = None
+        if active:
+            c.execute("SELECT team_name, amount FROM bids WHERE item_id = ? ORDER BY amount DESC LIMIT 1", (active[0],))
+            top_bid = c.fetchone()
+            c.execute(f"SELECT {RTM_COLUMNS} FROM rtm_decisions WHERE item_id = ?", (active[0],))
+            rtm = rtm_state(c.fetchone())
+        c.execute("SELECT name, budget_remaining FROM teams")
+        budgets = dict(c.fetchall())
+        c.execute("SELECT team_name, rtm_total, rtm_indian, rtm_overseas FROM team_stats")
+        rtm_used = {team: {'total': total, 'indian': indian, 'overseas': overseas}
+                    for team, total, indian, overseas in c.fetchall()}
+        return {'active': active, 'top_bid': top_bid, 'rtm': rtm, 'budgets': budgets, 'rtm_used': rtm_used}
+
+    def save_bid(self, c, item_id, team_name, amount, expected_amount, ts):
+        """Conditional on current_bid still being expected_amount; returns False if it wasn't."""
+        c.execute("UPDATE items SET current_bid = ?, last_activity_timestamp = ? WHERE id = ? AND is_active = 1 AND current_bid = ?",
+                  (amount, ts, item_id, expected_amount))
+        if c.rowcount == 0:
+            return False
+        c.execute("INSERT INTO bids (item_id, team_name, amount, timestamp) VALUES (?, ?, ?, ?)",
+                  (item_id, team_name, amount, datetime.fromtimestamp(ts).isoformat()))
+        return True
+
+    def close_lot(self, c, item_id):
+        """Deactivates item_id; returns False if it was no longer active."""
+        c.execute("UPDATE items SET is_active = 0 WHERE id = ? AND is_active = 1", (item_id,))
+        return c.rowcount == 1
+
+    def save_rtm(self, c, rtm):
+        c.execute(f"INSERT OR REPLACE INTO rtm_decisions ({RTM_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+                  (rtm['item_id'], rtm['prev_team'], rtm['bidder'], rtm['amount'], rtm['timestamp'], rtm['deadline']))
+
+    def clear_rtm(self, c, item_id):
+        c.execute("DELETE FROM rtm_decisions WHERE item_id = ?", (item_id,))
+
+    def save_sale(self, c, item, team_name, amount, is_rtm):
+        c.execute("UPDATE teams SET budget_remaining = budget_remaining - ? WHERE name = ?", (amount, team_name))
+        c.execute("UPDATE items SET winner_team = ? WHERE id = ?", (team_name, item[0]))
+        c.execute("INSERT INTO sold_items (item_name, sold_amount, rating, category, nationality, team_bought, timestamp, is_rtm) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                  (item[1], amount, item[2], item[3], item[4], team_name, datetime.now().isoformat(), 1 if is_rtm else 0))
+        c.execute("DELETE FROM unsold_items WHERE item_name = ?", (item[1],))
+        self.clear_rtm(c, item[0])
+
+    def save_unsold(self, c, item_id):
+        """Marks item_id unsold; returns its name (None if there is no such item)."""
+        c.execute("UPDATE items SET winner_team = 'UNSOLD', is_active = 0, unsold_timestamp = ? WHERE id = ?",
+                  (datetime.now().timestamp(), item_id))
+        self.clear_rtm(c, item_id)
+        c.execute("SELECT name, rating, category, nationality FROM items WHERE id = ?", (item_id,))
+        details = c.fetchone()
+        if details:
+            c.execute("INSERT INTO unsold_items (item_name, rating, category, nationality, status, timestamp) VALUES (?, ?, ?, ?, ?, ?)",
+                      details + ('Unsold', datetime.now().isoformat()))
+        return details[0] if details else None
+
+
+# ---------- ENGINE ----------
+
+class AuctionEngine:
+    """
+    The active lot, its top bid and pending RTM decision, team budgets and RTM
+    counters, held in memory.
+
+    Bids, stops and sales are decided against that state and written through to
+    the repository in the same transaction. The state is tagged with the
+    state_version it corresponds to and reloaded whenever the database has moved
+    on without the engine (admin edits, the CLI, another process), so the
+    in-memory copy is never trusted past a write it didn't make.
+    """
+
+    def __init__(self, repository=None):
+        self.repository = repository or SQLiteRepository()
+        self._lock = threading.RLock()
+        self._version = None
+        self._active = None
+        self._top_bid = None
+        self._rtm = None
+        self._budgets = {}
+        self._rtm_used = {}
+
+    # --- state sync ---
+
+    def _reload(self, c):
+        # Version first: outside a transaction a write can land between the two reads,
+        # and state newer than its tag only costs one more reload, never a missed one
+        version = self.repository.version(c)
+        state = self.repository.load(c)
+        self._active = state['active']
+        self._top_bid = state['top_bid']
+        self._rtm = state['rtm']
+        self._budgets = state['budgets']
+        self._rtm_used = state['rtm_used']
+        self._version = version
+
+    def _sync(self, c):
+        if self.repository.version(c) != self._version:
+            self._reload(c)
+
+    @contextmanager
+    def _write(self):
+        """Engine lock plus one write transaction, with the state synced inside it."""
+        with self._lock:
+            try:
+                with self.repository.transaction() as c:
+                    self._sync(c)
+                    yield c
+                    self._version = self.repository.version(c)
+            except BaseException:
+                # Memory may be ahead of what was rolled back
+                self._version = None
+                raise
+
+    @contextmanager
+    def _read(self):
+        with self._lock:
+            self._sync(self.repository.read_cursor())
+            yield
+
+    # --- reads ---
+
+    def active_item(self):
+        with self._read():
+            return self._active
+
+    def top_bid(self):
+        """(team_name, amount) of the highest bid on the active lot, or None."""
+        with self._read():
+            return self._top_bid
+
+    def pending_rtm(self):
+        """rtm_state dict of the RTM decision pending on the active lot, or None."""
+        with self._read():
+            return self._rtm
+
+    def team_budget(self, team_name):
+        with self._read():
+            return self._budgets.get(team_name, 0)
+
+    def check_rtm_eligibility(self, team_name, is_indian):
+        """True if team_name still has an RTM left for a player of this nationality."""
+        with self._read():
+            return self._rtm_eligible(team_name, is_indian)
+
+    def _rtm_eligible(self, team_name, is_indian):
+        used = self._rtm_used.get(team_name, {'total': 0, 'indian': 0, 'overseas': 0})
+        limits = settings.get_settings().rtm_limits()
+        if used['total'] >= limits['total']:
+            print(f"RTM SKIPPED: Total Limit Reached for {team_name}")
+            return False
+        elif is_indian and used['indian'] >= limits['indian']:
+            print(f"RTM SKIPPED: Indian Limit Reached for {team_name}")
+            return False
+        elif not is_indian and used['overseas'] >= limits['overseas']:
+            print(f"RTM SKIPPED: Overseas Limit Reached for {team_name}")
+            return False
+        return True
+
+    # --- writes ---
+
+    def place_bid(self, item_id, team_name, current_amount, has_bids=None):
+        """
+        Places the next bid on item_id as a compare-and-swap against the bid the caller saw.
+
+        current_amount is the current_bid the caller rendered; has_bids is whether it saw
+        any bids yet (None = don't check). Concurrent clicks on the same price resolve to
+        exactly one accepted bid and the rest come back stale.
+
+        Returns {'status', 'amount', 'current_bid', 'budget'} where status is one of
+        BID_ACCEPTED, BID_STALE, BID_INSUFFICIENT_BUDGET or BID_CLOSED; accepted bids
+        also carry the 'trace_id' of their latency trace (bidtrace.py).
+        """
+        return self.place_bids([(item_id, team_name, current_amount, has_bids)])[0]
+
+    def place_bids(self, bids):
+        """
+        Applies (item_id, team_name, current_amount, has_bids) bids in order, all in
+        one transaction, as if each had been a place_bid() call. Returns the results
+        in the same order; they only take effect if the whole batch commits.
+        """
+        with self._lock:
+            with self._write() as c:
+                results = [self._place_bid(c, *bid) for bid in bids]
+            # Still under the lock, so self._version is the version this commit produced
+            committed_at = time.time()
+            accepted = 0
+            for (item_id, team_name, *_), result in zip(bids, results):
+                if result['status'] == BID_ACCEPTED:
+                    result['trace_id'] = bidtrace.committed(item_id, team_name, result['amount'], self._version, committed_at)
+                    accepted += 1
+        metrics.record_bids(accepted)
+        return results
+
+    def _place_bid(self, c, item_id, team_name, current_amount, has_bids=None):
+        lot = self._active
+        if not lot or lot[0] != item_id or self._rtm:
+            # Not the open lot, or bidding has stopped and the previous team is deciding
+            return {'status': BID_CLOSED, 'amount': None, 'current_bid': None, 'budget': None}
+        if self._bid_deadline(lot) <= datetime.now().timestamp():
+            # Timer has run out; the clock just hasn't closed the lot yet
+            return {'status': BID_CLOSED, 'amount': None, 'current_bid': None, 'budget': None}
+        live_bid = lot[CURRENT_BID]
+        live_has_bids = self._top_bid is not None
+
+        # Expected-version check: someone else got in first
+        if live_bid != current_amount or (has_bids is not None and has_bids != live_has_bids):
+            return {'status': BID_STALE, 'amount': None, 'current_bid': live_bid, 'budget': None}
+
+        # First bid is at base price, every later one adds the tier increment
+        if not live_has_bids:
+            new_amount = current_amount
+        else:
+            new_amount = current_amount + settings.get_settings().bid_increment(current_amount)
+
+        remaining_budget = self._budgets.get(team_name, 0)
+        if new_amount > remaining_budget:
+            return {'status': BID_INSUFFICIENT_BUDGET, 'amount': new_amount, 'current_bid': live_bid, 'budget': remaining_budget}
+
+        ts = datetime.now().timestamp()
+        if not self.repository.save_bid(c, item_id, team_name, new_amount, current_amount, ts):
+            self._reload(c)
+            return {'status': BID_STALE, 'amount': None, 'current_bid': live_bid, 'budget': remaining_budget}
+
+        self._active = lot[:CURRENT_BID] + (new_amount,) + lot[CURRENT_BID + 1:LAST_ACTIVITY] + (ts,)
+        self._top_bid = (team_name, new_amount)
+        return {'status': BID_ACCEPTED, 'amount': new_amount, 'current_bid': new_amount, 'budget': remaining_budget}
+
+    def stop_bidding(self, item_id=None):
+        """
+        Closes the active lot (only if it is item_id, when given).
+        Returns an outcome dict if flow handled (rerun needed), None if nothing happened:
+        {'outcome': STOP_RTM, 'item_id', 'rtm_state'} when the previous team gets to decide
+        (recorded in rtm_decisions, with a timing_rtm_decision deadline),
+        {'outcome': STOP_UNSOLD, 'item_id', 'name'} when nobody bid,
+        {'outcome': STOP_SOLD, 'item_id', 'sale': (winner, amount, name)} otherwise.
+        """
+        with self._write() as c:
+            return self._stop(c, item_id)
+
+    def finalize_sale(self, recipient_team=None, is_rtm=False):
+        """
+        Sells the active lot to recipient_team at its current bid, or to the highest
+        bidder when no recipient is given. Returns (winner, amount, name), or None if
+        there was nothing to sell.
+        """
+        with self._write() as c:
+            return self._finalize(c, recipient_team, is_rtm)
+
+    def resolve_rtm(self, item_id, retain):
+        """
+        Answers the RTM decision pending on item_id: retain=True sells to the previous
+        team at the current bid, False to the highest bidder. Only acts while that
+        decision is still open, so a stale click can't touch a later lot. Returns
+        {'outcome': STOP_SOLD, 'item_id', 'sale'}, or {'outcome': RTM_DECISION_CLOSED,
+        'item_id'} if the decision was already taken or timed out.
+        """
+        with self._write() as c:
+            rtm = self._rtm
+            if not rtm or rtm['item_id'] != item_id:
+                return {'outcome': RTM_DECISION_CLOSED, 'item_id': item_id}
+            if retain:
+                sale = self._finalize(c, rtm['prev_team'], is_rtm=True)
+            else:
+                sale = self._finalize(c)
+            if not sale:
+                return {'outcome': RTM_DECISION_CLOSED, 'item_id': item_id}
+            return {'outcome': STOP_SOLD, 'item_id': item_id, 'sale': sale}
+
+    def mark_unsold(self, item_id):
+        """Marks item_id unsold (closing it if it is the active lot); returns its name."""
+        with self._write() as c:
+            return self._mark_unsold(c, item_id)
+
+    def expire(self, item_id):
+        """
+        Closes item_id once its timer has run out: stops bidding (sale or RTM) if it
+        has bids, otherwise marks it unsold. The deadline is checked again under the
+        lock, so a bid that landed after the caller looked keeps the lot open.
+        Returns the outcome dict ({'outcome': STOP_PENDING, 'item_id', 'remaining'}
+        with the seconds left if not yet due), or None if the item is no longer the
+        active one.
+        """
+        with self._write() as c:
+            lot = self._active
+            if not lot or lot[0] != item_id or self._rtm:
+                return None
+            remaining = self._bid_deadline(lot) - datetime.now().timestamp()
+            if remaining > 0:
+                return {'outcome': STOP_PENDING, 'item_id': item_id, 'remaining': remaining}
+            return self._stop(c, item_id)
+
+    def expire_rtm(self, item_id):
+        """
+        Sells item_id to the highest bidder once its RTM decision deadline has passed
+        without an answer. Returns the STOP_SOLD outcome, STOP_PENDING (with
+        'remaining') if not yet due, or None if the decision is no longer pending.
+        """
+        with self._write() as c:
+            rtm = self._rtm
+            if not rtm or rtm['item_id'] != item_id:
+                return None
+            remaining = rtm['deadline'] - datetime.now().timestamp()
+            if remaining > 0:
+                return {'outcome': STOP_PENDING, 'item_id': item_id, 'remaining': remaining}
+            sale = self._finalize(c)
+            return {'outcome': STOP_SOLD, 'item_id': item_id, 'sale': sale} if sale else None
+
+    def _bid_deadline(self, lot):
+        """Epoch seconds at which bidding on lot closes: timing_bid_duration after its last activity."""
+        return (lot[LAST_ACTIVITY] or time.time()) + settings.get_settings().timing_bid_duration
+
+    def _stop(self, c, item_id=None):
+        lot = self._active
+        if not lot or (item_id and item_id != lot[0]):
+            return None
+        if self._rtm:
+            # Already waiting on the previous team
+            return {'outcome': STOP_RTM, 'item_id': lot[0], 'rtm_state': dict(self._rtm)}
+        if not self._top_bid:
+            name = self._mark_unsold(c, lot[0])
+            return {'outcome': STOP_UNSOLD, 'item_id': lot[0], 'name': name}
+
+        bidder, amount = self._top_bid
+        previous_team = lot[PREVIOUS_TEAM]
+        # RTM applies when the previous team exists and isn't the highest bidder
+        prev_clean = previous_team.strip().lower() if previous_team else ""
+        if (prev_clean and prev_clean != bidder.strip().lower()
+                and settings.get_settings().rtm_option
+                and self._rtm_eligible(previous_team, lot[NATIONALITY] == 'India')):
+            started_at = datetime.now().timestamp()
+            rtm = {
+                'active': True,
+                'item_id': lot[0],
+                'prev_team': previous_team,
+                'bidder': bidder,
+                'amount': amount,
+                'timestamp': started_at,
+                'deadline': started_at + settings.get_settings().timing_rtm_decision
+            }
+            self.repository.save_rtm(c, rtm)
+            self._rtm = rtm
+            return {'outcome': STOP_RTM, 'item_id': lot[0], 'rtm_state': dict(rtm)}
+
+        sale = self._finalize(c)
+        if sale:
+            return {'outcome': STOP_SOLD, 'item_id': lot[0], 'sale': sale}
+        return None
+
+    def _finalize(self, c, recipient_team=None, is_rtm=False):
+        lot = self._active
+        if not lot:
+            return None
+        if not self.repository.close_lot(c, lot[0]):
+            self._reload(c)
+            return None
+
+        # RTM / forced sale goes at the current bid, otherwise to the highest bidder
+        winner, amount = recipient_team, lot[CURRENT_BID]
+        if not recipient_team and self._top_bid:
+            winner, amount = self._top_bid
+        self._active = None
+        self._top_bid = None
+        self._rtm = None
+        if not winner:
+            # Nothing to sell: record the lot as unsold rather than leave it closed with no outcome
+            self.repository.save_unsold(c, lot[0])
+            return None
+
+        self.repository.save_sale(c, lot, winner, amount, is_rtm)
+        if winner in self._budgets:
+            self._budgets[winner] -= amount
+        if is_rtm:
+            used = self._rtm_used.setdefault(winner, {'total': 0, 'indian': 0, 'overseas': 0})
+            used['total'] += 1
+            used['indian' if lot[NATIONALITY] == 'India' else 'overseas'] += 1
+        return winner, amount, lot[1]
+
+    def _mark_unsold(self, c, item_id):
+        name = self.repository.save_unsold(c, item_id)
+        if self._active and self._active[0] == item_id:
+            self._active = None
+            self._top_bid = None
+            self._rtm = None
+        return name
+
+
+_lock = threading.Lock()
+_engine = None
+
+
+def get_engine():
+    """Process-wide AuctionEngine over the app database."""
+    global _engine
+    if _engine is None:
+        with _lock:
+            if _engine is None:
+                _engine = AuctionEngine()
+    return _engine
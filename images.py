@@ -0,0 +1,214 @@
+import argparse
+import base64
+import hashlib
+import io
+import os
+import queue
+import sys
+import threading
+import time
+import urllib.request
+
+from PIL import Image, features
+
+import db
+
+# Local cache for player, team and sponsor images. Each remote URL is fetched
+# once, on a background thread, and stored as a thumbnail in static/img/ under
+# a hash of the URL; pages then point at the local copy instead of the remote
+# host, so a rerun never waits on (or hammers) an external CDN.
+#
+# src(url, size) is what the templates call. While an image isn't cached yet it
+# returns the original URL and queues the download; afterwards it returns
+#
+#   app/static/img/<hash>-<size>.webp?v=<hash>    with server.enableStaticServing
+#                                                 (long-lived Cache-Control via ?v=)
+#   data:image/webp;base64,...                    otherwise
+#
+# Warm the cache for everything in the database before an event with
+#
+#   python -m images
+
+# ---------- CONFIG ----------
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+CACHE_DIR = os.path.join(STATIC_DIR, "img")
+STATIC_URL = "app/static/img"
+
+# Longest side of the thumbnail, in pixels (about 2x the size on screen)
+LOGO = 160
+PLAYER = 480
+SPONSOR = 240
+BANNER = 1200
+
+FETCH_TIMEOUT = 10          # seconds per download
+MAX_BYTES = 10 * 1024 * 1024
+RETRY_AFTER = 300           # seconds before a failed URL is tried again
+USER_AGENT = "IBL-Auction/1.0 (image cache)"  # Wikimedia rejects requests without one
+FORMAT, EXTENSION = ("WEBP", "webp") if features.check("webp") else ("PNG", "png")
+
+_sources = {}     # (url, size) -> src string, once cached
+_failed = {}      # url -> time of the last failed fetch
+_queued = set()
+_lock = threading.Lock()
+_queue = queue.Queue()
+_worker = None
+
+
+def _key(url):
+    return hashlib.sha1(url.encode()).hexdigest()[:20]
+
+
+def _cache_files(url, size):
+    """(thumbnail path, animated original path) for url at size."""
+    key = _key(url)
+    return os.path.join(CACHE_DIR, f"{key}-{size}.{EXTENSION}"), os.path.join(CACHE_DIR, f"{key}.gif")
+
+
+def _cacheable(url):
+    return bool(url) and url.startswith(("http://", "https://"))
+
+
+# ---------- FETCH ----------
+
+def _download(url):
+    request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+    with urllib.request.urlopen(request, timeout=FETCH_TIMEOUT) as response:
+        data = response.read(MAX_BYTES + 1)
+    if len(data) > MAX_BYTES:
+        raise ValueError(f"larger than {MAX_BYTES} bytes")
+    return data
+
+
+def _write(path, data):
+    partial = f"{path}.{os.getpid()}.tmp"
+    with open(partial, "wb") as f:
+        f.write(data)
+    os.replace(partial, path)
+
+
+def fetch(url, sizes):
+    """Downloads url and writes its thumbnails at sizes. Raises on any failure."""
+    data = _download(url)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with Image.open(io.BytesIO(data)) as image:
+        if getattr(image, "is_animated", False):
+            # Resizing would drop the animation (the no-bidding placeholder GIF)
+            _write(_cache_files(url, 0)[1], data)
+            return
+        image.load()
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+        for size in sizes:
+            thumbnail = image.copy()
+            thumbnail.thumbnail((size, size), Image.LANCZOS)
+            out = io.BytesIO()
+            if FORMAT == "WEBP":
+                thumbnail.save(out, FORMAT, quality=85, method=4)
+            else:
+                thumbnail.save(out, FORMAT, optimize=True)
+            _write(_cache_files(url, size)[0], out.getvalue())
+
+
+def _work():
+    while True:
+        url, size = _queue.get()
+        try:
+            fetch(url, [size])
+        except Exception as e:
+            print(f"Image cache: {url}: {e}")
+            _failed[url] = time.time()
+        finally:
+            with _lock:
+                _queued.discard((url, size))
+
+
+def _enqueue(url, size):
+    global _worker
+    with _lock:
+        if (url, size) in _queued:
+            return
+        _queued.add((url, size))
+        if _worker is None:
+            _worker = threading.Thread(target=_work, name="image-cache", daemon=True)
+            _worker.start()
+    _queue.put((url, size))
+
+
+# ---------- SERVING ----------
+
+def _static_serving():
+    from streamlit import config
+    return config.get_option("server.enableStaticServing")
+
+
+def _source(path, version):
+    if _static_serving():
+        return f"{STATIC_URL}/{os.path.basename(path)}?v={version}"
+    with open(path, "rb") as f:
+        encoded = base64.b64encode(f.read()).decode()
+    mime = "image/gif" if path.endswith(".gif") else f"image/{EXTENSION}"
+    return f"data:{mime};base64,{encoded}"
+
+
+def src(url, size=PLAYER):
+    """What to put in <img src>: the cached thumbnail of url if there is one, else url itself."""
+    cached = _sources.get((url, size))
+    if cached is not None:
+        return cached
+    if not _cacheable(url):
+        return url
+    thumbnail, animated = _cache_files(url, size)
+    for path in (thumbnail, animated):
+        if os.path.exists(path):
+            _sources[(url, size)] = _source(path, _key(url))
+            return _sources[(url, size)]
+    if time.time() - _failed.get(url, 0) >= RETRY_AFTER:
+        _enqueue(url, size)
+    return url
+
+
+def warm(urls_with_sizes):
+    """Queues (url, size) pairs that aren't cached yet, e.g. on startup; returns how many."""
+    queued = 0
+    for url, size in urls_with_sizes:
+        if _cacheable(url) and src(url, size) == url:
+            queued += 1
+    return queued
+
+
+def known_images(c):
+    """(url, size) for every image the app shows, from the database."""
+    c.execute("SELECT logo_url FROM teams")
+    pairs = [(row[0], LOGO) for row in c.fetchall()]
+    c.execute("SELECT name, logo_url FROM sponsors")
+    for name, logo in c.fetchall():
+        pairs.append((logo, BANNER if name == 'Title Sponsor' else PLAYER if name == 'No Bidding Placeholder' else SPONSOR))
+    c.execute("SELECT image_url FROM items WHERE image_url IS NOT NULL AND image_url != ''")
+    pairs.extend((row[0], PLAYER) for row in c.fetchall())
+    return [(url, size) for url, size in dict.fromkeys(pairs) if _cacheable(url)]
+
+
+# ---------- ENTRY POINT ----------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m images", description="Fetch every image in the database into the local cache.")
+    parser.add_argument("--force", action="store_true", help="fetch again even if already cached")
+    args = parser.parse_args(argv)
+
+    fetched = cached = failed = 0
+    for url, size in known_images(db.get_read_cursor()):
+        if not args.force and any(os.path.exists(path) for path in _cache_files(url, size)):
+            cached += 1
+            continue
+        try:
+            fetch(url, [size])
+            fetched += 1
+        except Exception as e:
+            print(f"{url}: {e}", file=sys.stderr)
+            failed += 1
+    print(f"{fetched} fetched, {cached} already cached, {failed} failed ({CACHE_DIR})")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,524 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from collections import Counter
+
+import streamlit  # noqa: F401 (sets up streamlit before its protos are imported)
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from tornado.websocket import websocket_connect
+
+# Load test: starts the app with `streamlit run` on a scratch copy of the
+# database and connects headless websocket clients to it, the way browsers do.
+# Bidders log in as a team and hit Place Bid at random (Poisson) intervals while
+# every session's live panel reruns on its run_every timer. Run from the app
+# directory, e.g.
+#
+#   python -m loadtest --bidders 10 --viewers 50 --duration 60
+#   python -m loadtest --viewers 200 --bid-interval 1 --json results.json
+#   python -m datagen /tmp/big.db --players 5000 --teams 50 && python -m loadtest --db /tmp/big.db
+#
+# Reports rerun latency percentiles (page, live-panel tick, bid click), the
+# websocket bytes each kind of rerun sends to the browser, ticks that started late because the previous rerun hadn't finished, write-lock waits
+# seen by a probe connection, bids lost or duplicated (clicks vs. rows in
+# bids), and server CPU per session. The source database is never written.
+# All clients run in this one process; give it a spare core, or its own
+# scheduling shows up as latency.
+
+# ---------- CONFIG ----------
+DEFAULT_BIDDERS = 10
+DEFAULT_VIEWERS = 20
+DEFAULT_DURATION = 60.0      # seconds of measured load
+DEFAULT_BID_INTERVAL = 3.0   # mean seconds between one bidder's clicks
+DEFAULT_LOT_SECONDS = 20.0   # the auctioneer stops each lot after this long
+RTM_DECISION_SECONDS = 3     # so RTM lots auto-sell quickly during the test
+RAMP_SECONDS = 5.0           # sessions connect spread over this window
+RUN_TIMEOUT = 30.0           # a rerun taking longer than this counts as an error
+PROBE_INTERVAL = 0.25        # seconds between write-lock probes
+STARTUP_TIMEOUT = 60.0
+
+PLACE_BID = "🔨 Place Bid"
+
+# Warnings the Place Bid handler shows, in the order main.py checks them
+BID_OUTCOMES = [
+    ("Low Budget!", "low_budget"),
+    ("doesn't have enough budget", "insufficient_budget"),
+    ("still being processed", "timeout"),
+    ("Outbid!", "stale"),
+    ("Bidding is closed", "closed"),
+]
+
+
+def percentiles(values):
+    """p50 / p90 / p99 / max of a list of seconds, in milliseconds."""
+    if not values:
+        return None
+    values = sorted(values)
+    pick = lambda q: values[min(len(values) - 1, int(q * len(values)))]
+    return {
+        'count': len(values),
+        'p50_ms': round(pick(0.50) * 1000, 1),
+        'p90_ms': round(pick(0.90) * 1000, 1),
+        'p99_ms': round(pick(0.99) * 1000, 1),
+        'max_ms': round(values[-1] * 1000, 1),
+    }
+
+
+def byte_sizes(values):
+    """Mean / p50 / max of a list of byte counts."""
+    if not values:
+        return None
+    values = sorted(values)
+    return {
+        'count': len(values),
+        'mean': round(sum(values) / len(values)),
+        'p50': values[len(values) // 2],
+        'max': values[-1],
+    }
+
+
+# ---------- SERVER ----------
+
+def scratch_copy(source, directory):
+    """Consistent copy of the database (WAL included) for the test to write to."""
+    path = os.path.join(directory, "players_game.db")
+    src = sqlite3.connect(source)
+    dst = sqlite3.connect(path)
+    try:
+        src.backup(dst)
+    finally:
+        src.close()
+        dst.close()
+    return path
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(db_path, port, log):
+    env = dict(os.environ, IBL_DB_PATH=db_path)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", "main.py",
+         "--server.headless", "true", "--server.port", str(port),
+         "--server.fileWatcherType", "none", "--browser.gatherUsageStats", "false"],
+        env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+    deadline = time.time() + STARTUP_TIMEOUT
+    while time.time() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Streamlit exited with code {server.returncode}; see {log.name}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1) as r:
+                if r.status == 200:
+                    return server
+        except OSError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f"Streamlit didn't come up within {STARTUP_TIMEOUT:.0f}s; see {log.name}")
+
+
+def cpu_seconds(pid):
+    """User + system CPU time of a process (Linux /proc); None where unavailable."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+    except OSError:
+        return None
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+# ---------- CLIENT ----------
+
+class Session:
+    """
+    One browser tab: a websocket to /_stcore/stream speaking the same protobuf
+    messages as the frontend. It keeps the widget values the frontend would
+    (sent with every rerun) and remembers the run_every fragment so ticks rerun
+    only the live panel. One rerun is in flight at a time, as in a browser.
+    """
+
+    WIDGET_TYPES = ("button", "selectbox", "text_input", "radio")
+
+    def __init__(self, url, name):
+        self.url = url
+        self.name = name
+        self.ws = None
+        self.page_hash = ""
+        self.widgets = {}        # label -> (widget_id, fragment_id, proto)
+        self.states = {}         # widget_id -> WidgetState sent with every rerun
+        self.rendered = set()    # widget labels drawn by the last rerun
+        self.fragment_id = None  # live panel (run_every)
+        self.interval = 1.0
+        self._cache = {}         # hash -> ForwardMsg; the server sends ref_hash for repeats
+        self.latencies = {'page': [], 'tick': [], 'bid': []}
+        self.received = {'page': [], 'tick': [], 'bid': []}  # websocket bytes per rerun
+        self.late_ticks = 0
+
+    async def connect(self):
+        self.ws = await websocket_connect(self.url, subprotocols=["streamlit"])
+
+    def close(self):
+        if self.ws is not None:
+            self.ws.close()
+
+    async def rerun(self, kind, fragment_id=None, trigger=None):
+        """Sends a rerun and waits for it to finish; returns the alert texts it showed."""
+        msg = BackMsg()
+        client_state = msg.rerun_script
+        client_state.query_string = ""
+        client_state.page_script_hash = self.page_hash
+        if fragment_id:
+            client_state.fragment_id = fragment_id
+        client_state.widget_states.widgets.extend(self.states.values())
+        if trigger:
+            widget = client_state.widget_states.widgets.add()
+            widget.id = trigger
+            widget.trigger_value = True
+
+        started = time.perf_counter()
+        await self.ws.write_message(msg.SerializeToString(), binary=True)
+        alerts, received = await self._read_run()
+        self.latencies[kind].append(time.perf_counter() - started)
+        self.received[kind].append(received)
+        return alerts
+
+    async def _read_run(self):
+        # st.rerun() (new bid, lot change) ends a run early and starts the next
+        # one by itself; the click or tick is done when a run really finishes.
+        alerts, received = [], 0
+        self.rendered = set()
+        while True:
+            raw = await asyncio.wait_for(self.ws.read_message(), RUN_TIMEOUT)
+            if raw is None:
+                raise ConnectionError(f"{self.name}: server closed the connection")
+            received += len(raw)
+            msg = ForwardMsg()
+            msg.ParseFromString(raw)
+            kind = msg.WhichOneof("type")
+            if kind == "ref_hash":
+                msg = self._cache[msg.ref_hash]
+                kind = msg.WhichOneof("type")
+            elif msg.metadata.cacheable and msg.hash:
+                self._cache[msg.hash] = msg
+
+            if kind == "new_session":
+                self.page_hash = msg.new_session.page_script_hash
+            elif kind == "auto_rerun":
+                self.fragment_id = msg.auto_rerun.fragment_id
+                self.interval = msg.auto_rerun.interval
+            elif kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                element = msg.delta.new_element
+                element_type = element.WhichOneof("type")
+                if element_type in self.WIDGET_TYPES:
+                    widget = getattr(element, element_type)
+                    self.widgets[widget.label] = (widget.id, msg.delta.fragment_id, widget)
+                    self.rendered.add(widget.label)
+                elif element_type == "alert":
+                    alerts.append(element.alert.body)
+            elif kind == "script_finished":
+                if msg.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    return alerts, received
+
+    async def set_widget(self, label, **value):
+        """Changes a widget's value and reruns, like a user editing it."""
+        widget_id, fragment_id, _ = self.widgets[label]
+        state = WidgetState(id=widget_id, **value)
+        self.states[widget_id] = state
+        await self.rerun('page' if not fragment_id else 'tick', fragment_id)
+
+    async def login(self, team, password):
+        await self.rerun('page')
+        options = list(self.widgets["Select Team"][2].options)
+        await self.set_widget("Select Team", int_value=options.index(team))
+        await self.set_widget("Password", string_value=password)
+
+    async def tick(self):
+        await self.rerun('tick', self.fragment_id)
+
+    async def click(self, label):
+        widget_id, fragment_id, _ = self.widgets[label]
+        return await self.rerun('bid', fragment_id, trigger=widget_id)
+
+
+def classify_bid(alerts):
+    for text in alerts:
+        for needle, outcome in BID_OUTCOMES:
+            if needle in text:
+                return outcome
+    return "accepted"
+
+
+async def drive(session, deadline, stats, team=None, password=None, bid_interval=None):
+    """Runs one session until deadline: live-panel ticks, plus bids for a team."""
+    try:
+        await session.connect()
+        if team:
+            await session.login(team, password)
+        else:
+            await session.rerun('page')
+
+        now = time.perf_counter()
+        next_tick = now + session.interval
+        next_bid = now + random.expovariate(1 / bid_interval) if team else float("inf")
+        while True:
+            now = time.perf_counter()
+            due = min(next_tick, next_bid)
+            if due >= deadline:
+                break
+            if due > now:
+                await asyncio.sleep(due - now)
+                now = time.perf_counter()
+
+            if next_bid <= next_tick:
+                next_bid = now + random.expovariate(1 / bid_interval)
+                if PLACE_BID in session.rendered:
+                    outcome = classify_bid(await session.click(PLACE_BID))
+                    if outcome == "accepted" and PLACE_BID not in session.rendered:
+                        # The lot closed before the click arrived: Streamlit drops a
+                        # trigger for a button the rerun no longer draws, silently
+                        outcome = "dropped"
+                    stats['outcomes'][outcome] += 1
+                    if outcome == "accepted":
+                        stats['accepted'][team] += 1
+                    elif outcome == "timeout":
+                        stats['unconfirmed'][team] += 1
+                else:
+                    stats['outcomes']['no_button'] += 1
+            else:
+                # The browser's timer doesn't queue up missed ticks: one late
+                # tick runs as soon as the previous rerun finishes.
+                if now - next_tick > session.interval:
+                    session.late_ticks += 1
+                await session.tick()
+                next_tick = max(next_tick + session.interval, time.perf_counter())
+    except Exception as e:
+        stats['errors'].append(f"{session.name}: {type(e).__name__}: {e}")
+    finally:
+        session.close()
+
+
+# ---------- AUCTIONEER / PROBE ----------
+
+def run_auctioneer(stop, lot_seconds, stats):
+    """Keeps a lot open: activates the next player and stops each lot after lot_seconds."""
+    c = db.get_read_cursor()
+    opened = None
+    while not stop.is_set():
+        try:
+            active = auction.get_active_item()
+            if active is None:
+                c.execute("SELECT id FROM items WHERE is_active = 0 AND winner_team IS NULL ORDER BY id LIMIT 1")
+                row = c.fetchone()
+                if row:
+                    auction.set_active_item(row[0])
+                    opened = time.time()
+                    stats['lots'] += 1
+            elif opened is None:
+                opened = time.time()
+            elif time.time() - opened > lot_seconds and not auction.get_pending_rtm(active[0]):
+                auction.attempt_stop_bidding(active[0])
+                opened = None
+        except Exception as e:
+            stats['errors'].append(f"auctioneer: {type(e).__name__}: {e}")
+        stop.wait(0.5)
+
+
+def run_lock_probe(stop, db_path, waits):
+    """Times BEGIN IMMEDIATE on a separate connection: how long a writer waits for the lock."""
+    conn = sqlite3.connect(db_path, timeout=RUN_TIMEOUT, isolation_level=None)
+    try:
+        while not stop.is_set():
+            started = time.perf_counter()
+            conn.execute("BEGIN IMMEDIATE")
+            waits.append(time.perf_counter() - started)
+            conn.execute("ROLLBACK")
+            stop.wait(PROBE_INTERVAL)
+    finally:
+        conn.close()
+
+
+# ---------- REPORT ----------
+
+def bid_accounting(db_path, first_rowid, stats):
+    """Compares the clicks that were confirmed with the rows that reached bids."""
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute("SELECT team_name, item_id, amount FROM bids WHERE rowid > ?", (first_rowid,)).fetchall()
+    finally:
+        conn.close()
+    stored = Counter(team for team, _, _ in rows)
+    teams = set(stored) | set(stats['accepted'])
+    # A timed-out click may still have been applied; it is neither lost nor extra.
+    lost = sum(max(0, stats['accepted'][t] - stored[t]) for t in teams)
+    extra = sum(max(0, stored[t] - stats['accepted'][t] - stats['unconfirmed'][t]) for t in teams)
+    duplicated = sum(n - 1 for n in Counter((item_id, amount) for _, item_id, amount in rows).values() if n > 1)
+    return {'confirmed': sum(stats['accepted'].values()), 'stored': len(rows),
+            'lost': lost, 'extra': extra, 'duplicate_amounts': duplicated}
+
+
+def print_report(report):
+    print(f"\n{report['bidders']} bidders + {report['viewers']} viewers for {report['duration']:.0f}s "
+          f"({report['lots']} lots)")
+    for kind, label in (('page', "page load"), ('tick', "live tick"), ('bid', "bid click")):
+        p = report['latency'][kind]
+        if p:
+            print(f"  {label:<10} n={p['count']:<6} p50 {p['p50_ms']:>7.1f}  p90 {p['p90_ms']:>7.1f}  "
+                  f"p99 {p['p99_ms']:>7.1f}  max {p['max_ms']:>7.1f} ms")
+    for kind, label in (('page', "page load"), ('tick', "live tick"), ('bid', "bid click")):
+        b = report['bytes'][kind]
+        if b:
+            print(f"  {label:<10} websocket bytes per rerun: mean {b['mean']:>7}  p50 {b['p50']:>7}  max {b['max']:>7}")
+    print(f"  late ticks  {report['late_ticks']} of {report['latency']['tick']['count'] if report['latency']['tick'] else 0}")
+    lock = report['lock_wait']
+    if lock:
+        print(f"  lock wait   p50 {lock['p50_ms']:.1f}  p99 {lock['p99_ms']:.1f}  max {lock['max_ms']:.1f} ms "
+              f"({lock['count']} probes); 'database is locked' in server log: {report['locked_errors']}")
+    bids = report['bids']
+    print(f"  bids        {dict(report['outcomes'])}")
+    print(f"              confirmed {bids['confirmed']}, stored {bids['stored']}, lost {bids['lost']}, "
+          f"extra {bids['extra']}, duplicate amounts {bids['duplicate_amounts']}")
+    if report['server_cpu_seconds'] is not None:
+        print(f"  server CPU  {report['server_cpu_seconds']:.1f}s ({report['server_cpu_percent']:.0f}% of a core), "
+              f"{report['cpu_ms_per_session_second']:.1f} ms per session-second, "
+              f"{report['cpu_ms_per_rerun']:.1f} ms per rerun")
+    for error in report['errors'][:10]:
+        print(f"  error: {error}")
+    if len(report['errors']) > 10:
+        print(f"  ... {len(report['errors']) - 10} more errors")
+
+
+# ---------- ENTRY POINT ----------
+
+async def run_sessions(url, teams, args, stats):
+    deadline = time.perf_counter() + RAMP_SECONDS + args.duration
+    sessions, tasks = [], []
+    total = args.bidders + args.viewers
+    for i in range(total):
+        if i < args.bidders:
+            team, password = teams[i % len(teams)]
+            session = Session(url, f"bidder-{i + 1} ({team})")
+            coro = drive(session, deadline, stats, team, password, args.bid_interval)
+        else:
+            session = Session(url, f"viewer-{i - args.bidders + 1}")
+            coro = drive(session, deadline, stats)
+        sessions.append(session)
+        tasks.append(asyncio.ensure_future(coro))
+        await asyncio.sleep(RAMP_SECONDS / total)
+    await asyncio.gather(*tasks)
+    return sessions
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m loadtest", description="IBL auction load test.")
+    parser.add_argument("--bidders", type=int, default=DEFAULT_BIDDERS, help="sessions logged in as a team (round-robin over teams)")
+    parser.add_argument("--viewers", type=int, default=DEFAULT_VIEWERS, help="sessions that only watch")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION, help="seconds of load after ramp-up")
+    parser.add_argument("--bid-interval", type=float, default=DEFAULT_BID_INTERVAL, help="mean seconds between a bidder's clicks")
+    parser.add_argument("--lot-seconds", type=float, default=DEFAULT_LOT_SECONDS, help="stop each lot after this many seconds")
+    parser.add_argument("--db", default=os.environ.get("IBL_DB_PATH", "players_game.db"), help="database to copy (not modified)")
+    parser.add_argument("--seed", type=int, help="random seed for click timing")
+    parser.add_argument("--json", help="also write the report to this file")
+    return parser
+
+
+def main(argv=None):
+    global auction, db
+    args = build_parser().parse_args(argv)
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    workdir = tempfile.mkdtemp(prefix="ibl-loadtest-")
+    db_path = scratch_copy(args.db, workdir)
+    # The app modules read IBL_DB_PATH when imported, so they're imported only
+    # once it points at the scratch copy.
+    os.environ["IBL_DB_PATH"] = db_path
+    import auction
+    import db
+
+    db.migrate()
+    with db.immediate_transaction() as c:
+        c.execute("UPDATE items SET is_active = 0")
+        c.execute("INSERT OR REPLACE INTO global_settings (key, value) VALUES ('timing_rtm_decision', ?)", (str(RTM_DECISION_SECONDS),))
+        c.execute("SELECT name, password FROM teams ORDER BY name")
+        teams = c.fetchall()
+        c.execute("SELECT COALESCE(MAX(rowid), 0) FROM bids")
+        first_rowid = c.fetchone()[0]
+    if args.bidders and not teams:
+        print("Error: the database has no teams to bid as.", file=sys.stderr)
+        return 1
+
+    port = free_port()
+    log = open(os.path.join(workdir, "server.log"), "w")
+    print(f"Starting the app on port {port} (scratch data and log in {workdir})")
+    server = start_server(db_path, port, log)
+
+    stats = {'outcomes': Counter(), 'accepted': Counter(), 'unconfirmed': Counter(), 'errors': [], 'lots': 0}
+    stop = threading.Event()
+    lock_waits = []
+    helpers = [threading.Thread(target=run_auctioneer, args=(stop, args.lot_seconds, stats), daemon=True),
+               threading.Thread(target=run_lock_probe, args=(stop, db_path, lock_waits), daemon=True)]
+    try:
+        for thread in helpers:
+            thread.start()
+        cpu_before = cpu_seconds(server.pid)
+        started = time.perf_counter()
+        sessions = asyncio.run(run_sessions(f"ws://127.0.0.1:{port}/_stcore/stream", teams, args, stats))
+        elapsed = time.perf_counter() - started
+        cpu_after = cpu_seconds(server.pid)
+    finally:
+        stop.set()
+        for thread in helpers:
+            thread.join(timeout=RUN_TIMEOUT)
+        server.terminate()
+        server.wait(timeout=10)
+        log.close()
+
+    latency = {kind: percentiles([v for s in sessions for v in s.latencies[kind]]) for kind in ('page', 'tick', 'bid')}
+    reruns = sum(len(values) for s in sessions for values in s.latencies.values())
+    with open(log.name) as f:
+        locked_errors = f.read().count("database is locked")
+    report = {
+        'bidders': args.bidders,
+        'viewers': args.viewers,
+        'duration': elapsed,
+        'lots': stats['lots'],
+        'latency': latency,
+        'bytes': {kind: byte_sizes([v for s in sessions for v in s.received[kind]]) for kind in ('page', 'tick', 'bid')},
+        'late_ticks': sum(s.late_ticks for s in sessions),
+        'lock_wait': percentiles(lock_waits),
+        'locked_errors': locked_errors,
+        'outcomes': dict(stats['outcomes']),
+        'bids': bid_accounting(db_path, first_rowid, stats),
+        'server_cpu_seconds': None,
+        'errors': stats['errors'],
+    }
+    if cpu_before is not None and cpu_after is not None:
+        cpu = cpu_after - cpu_before
+        report['server_cpu_seconds'] = cpu
+        report['server_cpu_percent'] = 100 * cpu / elapsed
+        report['cpu_ms_per_session_second'] = 1000 * cpu / elapsed / max(1, len(sessions))
+        report['cpu_ms_per_rerun'] = 1000 * cpu / max(1, reruns)
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    return 1 if report['errors'] or report['bids']['lost'] or report['bids']['duplicate_amounts'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+import functools
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Process-wide metrics in the Prometheus text format. Reruns are timed phase by
+# phase (bootstrap, sidebar admin, team grid, slider, ...) into histograms, so
+# it's visible which section of the page eats the 1-second refresh budget, and
+# gauges report live values (sessions, active lot, bid rate, DB lock wait).
+#
+#   IBL_METRICS_PORT=9464 streamlit run main.py    # curl localhost:9464/metrics
+#   IBL_METRICS_FILE=metrics.prom streamlit run main.py
+#
+# The file is rewritten every FILE_INTERVAL seconds (node_exporter's textfile
+# collector picks it up); without either variable nothing is exported, but the
+# numbers still show in the admin Diagnostics tab.
+
+# ---------- CONFIG ----------
+PORT = int(os.environ.get("IBL_METRICS_PORT") or 0)
+HOST = os.environ.get("IBL_METRICS_HOST", "127.0.0.1")
+FILE = os.environ.get("IBL_METRICS_FILE")
+FILE_INTERVAL = 5.0
+RATE_WINDOW = 60.0        # seconds behind the per-minute gauges
+REFRESH_BUDGET = 1.0      # the live panels rerun every second
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_lock = threading.Lock()
+_local = threading.local()
+_registry = {}  # name -> metric, in registration order
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# ---------- METRICS ----------
+
+class Histogram:
+    """Cumulative-bucket histogram, one series per label combination."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets) + (float("inf"),)
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+
+    def observe(self, value, *labelvalues):
+        with _lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def series(self):
+        """{label values: (bucket counts, sum, count)}."""
+        with _lock:
+            return {labels: (s[:-2], s[-2], s[-1]) for labels, s in self._series.items()}
+
+    def samples(self):
+        for labelvalues, (counts, total, count) in sorted(self.series().items()):
+            for bound, bucket_count in zip(self.buckets, counts):
+                yield f"{self.name}_bucket{_labels(self.labelnames, labelvalues, [('le', _number(bound))])} {bucket_count}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labelvalues)} {_number(total)}"
+            yield f"{self.name}_count{_labels(self.labelnames, labelvalues)} {count}"
+
+
+class Gauge:
+    """A value read from fn() at export time; a None result leaves the gauge out."""
+
+    kind = "gauge"
+
+    def __init__(self, name, help_text, fn):
+        self.name = name
+        self.help = help_text
+        self.fn = fn
+
+    def samples(self):
+        try:
+            value = self.fn()
+        except Exception as e:
+            print(f"Metrics: gauge {self.name} failed: {e}")
+            return
+        if value is not None:
+            yield f"{self.name} {_number(value)}"
+
+
+class EventWindow:
+    """Timestamps and values of recent events, for per-minute rates and maxima."""
+
+    def __init__(self, seconds=RATE_WINDOW):
+        self.seconds = seconds
+        self._events = deque()
+
+    def add(self, value=1, count=1):
+        now = time.time()
+        with _lock:
+            self._events.append((now, value, count))
+            self._prune(now)
+
+    def _prune(self, now):
+        while self._events and self._events[0][0] <= now - self.seconds:
+            self._events.popleft()
+
+    def count(self):
+        with _lock:
+            self._prune(time.time())
+            return sum(count for _, _, count in self._events)
+
+    def max(self):
+        with _lock:
+            self._prune(time.time())
+            return max((value for _, value, _ in self._events), default=0.0)
+
+
+def register(metric):
+    """Adds metric to the registry; a metric registered again under its name replaces it."""
+    with _lock:
+        _registry[metric.name] = metric
+    return metric
+
+
+def gauge(name, help_text, fn):
+    return register(Gauge(name, help_text, fn))
+
+
+def render():
+    """Every registered metric in the Prometheus text exposition format."""
+    with _lock:
+        metrics = list(_registry.values())
+    lines = []
+    for metric in metrics:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+# ---------- BUILT-IN METRICS ----------
+
+RERUN_SECONDS = register(Histogram("ibl_rerun_seconds", "Script run duration (page rerun or fragment rerun).", ["run"]))
+PHASE_SECONDS = register(Histogram("ibl_rerun_phase_seconds", "Time spent in each section of a rerun.", ["phase"]))
+LOCK_WAIT_SECONDS = register(Histogram("ibl_db_lock_wait_seconds", "Wait for the SQLite write lock (BEGIN IMMEDIATE).",
+                                       buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)))
+
+bids = EventWindow()
+lock_waits = EventWindow()
+
+gauge("ibl_bids_per_minute", f"Bids accepted by this process in the last {RATE_WINDOW:.0f}s.", bids.count)
+gauge("ibl_db_lock_wait_max_seconds", f"Longest write-lock wait in the last {RATE_WINDOW:.0f}s.", lock_waits.max)
+
+
+def record_bids(count):
+    if count:
+        bids.add(count=count)
+
+
+def record_lock_wait(seconds):
+    LOCK_WAIT_SECONDS.observe(seconds)
+    lock_waits.add(seconds)
+
+
+# ---------- RERUN PHASES ----------
+
+def _close_phase():
+    phase = getattr(_local, "phase", None)
+    if phase is not None:
+        _local.phase = None
+        PHASE_SECONDS.observe(time.perf_counter() - phase[1], phase[0])
+
+
+def begin_run(label):
+    """
+    Starts timing a script run on this thread. A run left open by the previous
+    run (cut short by st.rerun() / st.stop()) is dropped, not recorded: its end
+    is unknown.
+    """
+    _local.phase = None
+    _local.run = (label, time.perf_counter())
+
+
+def phase(name):
+    """Ends the current phase of this thread's run and starts the next one."""
+    _close_phase()
+    if getattr(_local, "run", None) is not None:
+        _local.phase = (name, time.perf_counter())
+
+
+def end_run():
+    _close_phase()
+    run = getattr(_local, "run", None)
+    if run is not None:
+        _local.run = None
+        RERUN_SECONDS.observe(time.perf_counter() - run[1], run[0])
+
+
+def fragment_run(label):
+    """
+    Decorator for st.fragment functions: the fragment is a phase called label of
+    the page run it is part of, and on its own reruns also a run of its own.
+    Phases started inside the fragment end with it.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            standalone = getattr(_local, "run", None) is None
+            if standalone:
+                begin_run(label)
+            phase(label)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                if standalone:
+                    end_run()
+                else:
+                    _close_phase()
+        return wrapper
+    return decorate
+
+
+def phase_summary():
+    """Rows per phase, slowest mean first: phase, count, mean_ms, over_budget (runs > REFRESH_BUDGET)."""
+    rows = []
+    budget_index = PHASE_SECONDS.buckets.index(REFRESH_BUDGET)
+    for (name,), (counts, total, count) in PHASE_SECONDS.series().items():
+        rows.append({
+            'phase': name,
+            'count': count,
+            'mean_ms': round(total / count * 1000, 2) if count else 0.0,
+            'over_budget': count - counts[budget_index],
+        })
+    rows.sort(key=lambda row: row['mean_ms'], reverse=True)
+    return rows
+
+
+# ---------- EXPORT ----------
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(port=PORT, host=HOST):
+    """Serves /metrics on a daemon thread; returns the server."""
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def write_file(path=FILE):
+    """Writes the metrics to path, atomically (textfile collectors may read it any time)."""
+    partial = f"{path}.{os.getpid()}.tmp"
+    with open(partial, "w") as f:
+        f.write(render())
+    os.replace(partial, path)
+
+
+def _write_forever(path, interval):
+    while True:
+        try:
+            write_file(path)
+        except OSError as e:
+            print(f"Metrics: could not write {path}: {e}")
+        time.sleep(interval)
+
+
+def start_exporters(port=PORT, path=FILE):
+    """Starts whichever of the HTTP endpoint and the file writer is configured."""
+    server = None
+    if port:
+        try:
+            server = serve(port)
+        except OSError as e:
+            print(f"Metrics: could not listen on {HOST}:{port}: {e}")
+    if path:
+        threading.Thread(target=_write_forever, args=(path, FILE_INTERVAL), name="metrics-file", daemon=True).start()
+    return server
@@ -0,0 +1,222 @@
+import csv
+import io
+import time
+
+import db
+
+# Bulk player import (CSV / Excel). Kept free of Streamlit so it can be driven
+# from the admin sidebar as well as from scripts.
+
+# ---------- CONFIG ----------
+CHUNK_SIZE = 2000        # rows written per transaction
+MAX_RATING = 100
+
+CATEGORIES = ["Batsman", "Bowler", "Allrounder", "Wicketkeeper"]
+NATIONALITIES = ["India", "Afghanistan", "Australia", "Bangladesh", "England", "New Zealand", "Sri Lanka", "South Africa", "West Indies", "Other"]
+
+REQUIRED_COLUMNS = ("name", "rating", "category", "nationality", "base_price")
+OPTIONAL_COLUMNS = ("image_url", "previous_team")
+
+_CATEGORY_LOOKUP = {c.lower(): c for c in CATEGORIES}
+_NATIONALITY_LOOKUP = {n.lower(): n for n in NATIONALITIES}
+
+
+# ---------- READING ----------
+
+def _normalize_header(name):
+    # "Base Price" (export_all_data) and "base_price" both map to base_price
+    return str(name or "").strip().lower().replace(" ", "_")
+
+
+def _read_csv(file):
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    reader = csv.reader(text)
+    header = next(reader, None)
+    if header is None:
+        return
+    yield [_normalize_header(h) for h in header]
+    yield from reader
+
+
+def _read_xlsx(file):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError("Excel import needs the openpyxl package; upload a CSV instead.")
+    # read_only streams rows instead of loading the whole sheet
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        yield [_normalize_header(h) for h in header]
+        for row in rows:
+            yield ["" if v is None else v for v in row]
+    finally:
+        workbook.close()
+
+
+def read_rows(file, filename):
+    """
+    Streams (row_number, {column: value}) from an uploaded CSV or .xlsx file.
+    row_number is the line in the sheet, counting the header as line 1.
+    """
+    if filename.lower().endswith((".xlsx", ".xlsm")):
+        rows = _read_xlsx(file)
+    elif filename.lower().endswith(".csv"):
+        rows = _read_csv(file)
+    else:
+        raise ValueError("Unsupported file type; upload a .csv or .xlsx file.")
+
+    header = next(rows, None)
+    if header is None:
+        raise ValueError("The file is empty.")
+    missing = [col for col in REQUIRED_COLUMNS if col not in header]
+    if missing:
+        raise ValueError(f"Missing column(s): {', '.join(missing)}")
+
+    for row_number, row in enumerate(rows, start=2):
+        if not any(str(v).strip() for v in row):
+            continue
+        yield row_number, dict(zip(header, row))
+
+
+# ---------- VALIDATION ----------
+
+def _to_int(value):
+    # Spreadsheets hand back 85.0 / "85.0" for integer cells
+    number = float(str(value).strip().replace(",", ""))
+    if not number.is_integer():
+        raise ValueError
+    return int(number)
+
+
+def _to_amount(value):
+    # Plain rupees, or the "₹2.00 Cr" / "₹50L" strings format_amount() writes into exports
+    text = str(value).strip().replace("₹", "").replace(",", "").replace(" ", "")
+    for suffix, unit in (("Cr", 10000000), ("L", 100000)):
+        if text.endswith(suffix):
+            return _to_int(round(float(text[:-len(suffix)]) * unit))
+    return _to_int(text)
+
+
+def validate_row(row, team_names):
+    """
+    Checks one row against the same rules as the Add New Player form.
+    Returns (values, errors); values is the (name, rating, category, nationality,
+    image_url, base_price, previous_team) tuple when errors is empty.
+    base_price is in rupees, either plain or formatted as in Export Data.
+    """
+    errors = []
+
+    name = str(row.get("name", "")).strip()
+    if not name:
+        errors.append("name is empty")
+
+    rating = None
+    try:
+        rating = _to_int(row.get("rating", ""))
+        if not 0 <= rating <= MAX_RATING:
+            errors.append(f"rating must be between 0 and {MAX_RATING}")
+    except ValueError:
+        errors.append(f"rating '{row.get('rating', '')}' is not a whole number")
+
+    category = _CATEGORY_LOOKUP.get(str(row.get("category", "")).strip().lower())
+    if category is None:
+        errors.append(f"category '{row.get('category', '')}' must be one of {', '.join(CATEGORIES)}")
+
+    nationality = _NATIONALITY_LOOKUP.get(str(row.get("nationality", "")).strip().lower())
+    if nationality is None:
+        errors.append(f"nationality '{row.get('nationality', '')}' must be one of {', '.join(NATIONALITIES)}")
+
+    base_price = None
+    try:
+        base_price = _to_amount(row.get("base_price", ""))
+        if base_price <= 0:
+            errors.append("base_price must be positive")
+    except ValueError:
+        errors.append(f"base_price '{row.get('base_price', '')}' is not a whole number of rupees")
+
+    previous_team = str(row.get("previous_team", "")).strip()
+    if previous_team in ("", "None"):
+        previous_team = None
+    elif previous_team not in team_names:
+        errors.append(f"previous_team '{previous_team}' is not a registered team")
+
+    image_url = str(row.get("image_url", "")).strip()
+
+    if errors:
+        return None, errors
+    return (name, rating, category, nationality, image_url, base_price, previous_team), []
+
+
+# ---------- IMPORT ----------
+
+ITEM_COLUMNS = ("name", "rating", "category", "nationality", "image_url", "base_price", "previous_team")
+
+
+def _write_chunk(inserts, updates, update_columns):
+    with db.immediate_transaction() as c:
+        if inserts:
+            c.executemany("INSERT INTO items (name, rating, category, nationality, image_url, base_price, previous_team) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                          inserts)
+        if updates:
+            c.executemany(f"UPDATE items SET {', '.join(f'{col} = ?' for col in update_columns)} WHERE id = ?",
+                          updates)
+
+
+def import_players(file, filename, chunk_size=CHUNK_SIZE):
+    """
+    Validates and upserts every row of an uploaded player sheet.
+
+    Players are matched by name: an existing player is updated in place (bids,
+    sale and active state are left alone, as are optional columns the sheet
+    doesn't have), a new name is inserted. Valid rows are
+    written in chunks of chunk_size, each chunk in one transaction; invalid rows
+    are skipped and reported. Returns a dict with inserted, updated, errors
+    ([(row_number, name, message)]), rows and seconds.
+    """
+    started = time.perf_counter()
+    report = {'inserted': 0, 'updated': 0, 'errors': [], 'rows': 0, 'seconds': 0.0}
+
+    c = db.get_read_cursor()
+    c.execute("SELECT name FROM teams")
+    team_names = {row[0] for row in c.fetchall()}
+    c.execute("SELECT name, id FROM items")
+    existing = dict(c.fetchall())
+
+    seen = {}  # name -> row_number, to reject duplicates within the file
+    inserts, updates = [], []
+    update_columns = None
+    for row_number, row in read_rows(file, filename):
+        if update_columns is None:
+            update_columns = [col for col in ITEM_COLUMNS[1:] if col in row]
+            update_index = [ITEM_COLUMNS.index(col) for col in update_columns]
+        report['rows'] += 1
+        values, errors = validate_row(row, team_names)
+        if not errors and values[0] in seen:
+            errors = [f"duplicate of row {seen[values[0]]}"]
+        if errors:
+            report['errors'].append((row_number, str(row.get("name", "")).strip(), "; ".join(errors)))
+            continue
+
+        seen[values[0]] = row_number
+        if values[0] in existing:
+            updates.append(tuple(values[i] for i in update_index) + (existing[values[0]],))
+        else:
+            inserts.append(values)
+
+        if len(inserts) + len(updates) >= chunk_size:
+            _write_chunk(inserts, updates, update_columns)
+            report['inserted'] += len(inserts)
+            report['updated'] += len(updates)
+            inserts, updates = [], []
+
+    if inserts or updates:
+        _write_chunk(inserts, updates, update_columns)
+        report['inserted'] += len(inserts)
+        report['updated'] += len(updates)
+
+    report['seconds'] = time.perf_counter() - started
+    return report
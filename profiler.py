@@ -0,0 +1,272 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+# SQL profiler. When enabled, db hands out ProfilingCursor wrappers that time
+# every statement (execute plus the fetches that read its rows) and attribute it
+# to the code that ran it. Statements are aggregated per script run and over a
+# rolling window; the admin Diagnostics tab shows both and exports them as JSON.
+#
+# Off by default; turn it on from the Diagnostics tab or with IBL_SQL_PROFILE=1.
+# A change takes effect for cursors handed out after it (the next rerun).
+
+# ---------- CONFIG ----------
+WINDOW_SECONDS = 300      # rolling window for the aggregate view
+BUCKET_SECONDS = 10       # window granularity
+RUN_HISTORY = 200         # finished runs kept for the per-run view
+REPEATED_STATEMENT = 10   # same statement this often in one run: probably an N+1 loop
+
+enabled = os.environ.get("IBL_SQL_PROFILE") == "1"
+
+_THIS_FILE = os.path.basename(__file__)
+_lock = threading.Lock()
+_local = threading.local()
+_runs = deque(maxlen=RUN_HISTORY)
+_buckets = {}  # bucket start -> {(sql, caller): stats}
+
+# Per-statement stats: [count, seconds, max_seconds, rows, max_per_run]
+COUNT, SECONDS, MAX_SECONDS, ROWS, MAX_PER_RUN = range(5)
+
+
+def _new_stats():
+    return [0, 0.0, 0.0, 0, 0]
+
+
+def _normalize(sql):
+    return " ".join(sql.split())
+
+
+def _caller():
+    """'file.py:line function' of the first frame outside this module."""
+    frame = sys._getframe(2)
+    while frame is not None and os.path.basename(frame.f_code.co_filename) == _THIS_FILE:
+        frame = frame.f_back
+    if frame is None:
+        return "?"
+    return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno} {frame.f_code.co_name}"
+
+
+def _record(key, seconds, rows, executed):
+    run = getattr(_local, "run", None)
+    if run is not None:
+        stats = run['statements'].get(key)
+        if stats is None:
+            stats = run['statements'][key] = _new_stats()
+        stats[COUNT] += executed
+        stats[SECONDS] += seconds
+        stats[MAX_SECONDS] = max(stats[MAX_SECONDS], seconds)
+        stats[ROWS] += rows
+
+    bucket = int(time.time() // BUCKET_SECONDS * BUCKET_SECONDS)
+    with _lock:
+        statements = _buckets.get(bucket)
+        if statements is None:
+            statements = _buckets[bucket] = {}
+            for old in [b for b in _buckets if b <= bucket - WINDOW_SECONDS]:
+                del _buckets[old]
+        stats = statements.get(key)
+        if stats is None:
+            stats = statements[key] = _new_stats()
+        stats[COUNT] += executed
+        stats[SECONDS] += seconds
+        stats[MAX_SECONDS] = max(stats[MAX_SECONDS], seconds)
+        stats[ROWS] += rows
+
+
+# ---------- CURSOR ----------
+
+class ProfilingCursor:
+    """
+    Stands in for a sqlite3.Cursor. execute() / executemany() and the fetches
+    that follow are timed against (statement, caller); everything else is passed
+    through to the real cursor.
+    """
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._key = None
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def _run(self, method, sql, params, caller):
+        self._key = (_normalize(sql), caller)
+        started = time.perf_counter()
+        try:
+            method(sql, params)
+        finally:
+            _record(self._key, time.perf_counter() - started, 0, 1)
+        return self
+
+    def execute(self, sql, params=()):
+        return self._run(self._cursor.execute, sql, params, _caller())
+
+    def executemany(self, sql, seq_of_params):
+        return self._run(self._cursor.executemany, sql, seq_of_params, _caller())
+
+    def _fetched(self, started, rows):
+        if self._key is not None:
+            _record(self._key, time.perf_counter() - started, rows, 0)
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = self._cursor.fetchone()
+        self._fetched(started, row is not None)
+        return row
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = self._cursor.fetchall()
+        self._fetched(started, len(rows))
+        return rows
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        rows = self._cursor.fetchmany(self._cursor.arraysize if size is None else size)
+        self._fetched(started, len(rows))
+        return rows
+
+    def __iter__(self):
+        while True:
+            row = self.fetchone()
+            if row is None:
+                return
+            yield row
+
+
+def wrap(cursor):
+    """The cursor itself, or a ProfilingCursor around it while profiling is enabled."""
+    return ProfilingCursor(cursor) if enabled else cursor
+
+
+def enable(on=True):
+    global enabled
+    enabled = bool(on)
+
+
+def reset():
+    with _lock:
+        _runs.clear()
+        _buckets.clear()
+
+
+# ---------- RUNS ----------
+
+def begin_run(label):
+    """
+    Starts collecting the calling thread's statements as one run (a page rerun,
+    a fragment rerun). Finishes the thread's previous run if it is still open,
+    which is how runs cut short by st.rerun() / st.stop() get closed.
+    """
+    end_run()
+    if enabled:
+        _local.run = {'label': label, 'started': time.time(), 'clock': time.perf_counter(), 'statements': {}}
+
+
+def end_run():
+    run = getattr(_local, "run", None)
+    if run is None:
+        return
+    _local.run = None
+    run['seconds'] = time.perf_counter() - run.pop('clock')
+    bucket = int(run['started'] // BUCKET_SECONDS * BUCKET_SECONDS)
+    with _lock:
+        _runs.append(run)
+        window = _buckets.get(bucket, {})
+        for key, stats in run['statements'].items():
+            stats[MAX_PER_RUN] = stats[COUNT]
+            if key in window:
+                window[key][MAX_PER_RUN] = max(window[key][MAX_PER_RUN], stats[COUNT])
+
+
+def fragment_run(label):
+    """
+    Decorator for st.fragment functions: a fragment rerun is collected as a run
+    of its own, while during a page run the fragment's statements stay in the
+    page's run.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if getattr(_local, "run", None) is not None:
+                return fn(*args, **kwargs)
+            begin_run(label)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                end_run()
+        return wrapper
+    return decorate
+
+
+def _rows(statements, runs=None):
+    rows = []
+    for (sql, caller), stats in statements.items():
+        row = {
+            'sql': sql,
+            'caller': caller,
+            'count': stats[COUNT],
+            'total_ms': round(stats[SECONDS] * 1000, 3),
+            'max_ms': round(stats[MAX_SECONDS] * 1000, 3),
+            'rows': stats[ROWS],
+            'max_per_run': stats[MAX_PER_RUN],
+            'repeated': stats[MAX_PER_RUN] >= REPEATED_STATEMENT,
+        }
+        if runs:
+            row['per_run'] = round(stats[COUNT] / runs, 2)
+        rows.append(row)
+    rows.sort(key=lambda row: row['total_ms'], reverse=True)
+    return rows
+
+
+def recent_runs(limit=50):
+    """Newest first: {'label', 'started', 'seconds', 'statements', 'sql_ms', 'details'}."""
+    with _lock:
+        runs = list(_runs)[-limit:]
+    summaries = []
+    for run in reversed(runs):
+        details = _rows(run['statements'])
+        summaries.append({
+            'label': run['label'],
+            'started': datetime.fromtimestamp(run['started']).isoformat(timespec="milliseconds"),
+            'seconds': round(run['seconds'], 4),
+            'statements': sum(row['count'] for row in details),
+            'sql_ms': round(sum(row['total_ms'] for row in details), 3),
+            'details': details,
+        })
+    return summaries
+
+
+def window_stats():
+    """Statements over the last WINDOW_SECONDS, most total time first, with the run count."""
+    cutoff = time.time() - WINDOW_SECONDS
+    totals = {}
+    with _lock:
+        for bucket, statements in _buckets.items():
+            if bucket + BUCKET_SECONDS <= cutoff:
+                continue
+            for key, stats in statements.items():
+                total = totals.setdefault(key, _new_stats())
+                total[COUNT] += stats[COUNT]
+                total[SECONDS] += stats[SECONDS]
+                total[MAX_SECONDS] = max(total[MAX_SECONDS], stats[MAX_SECONDS])
+                total[ROWS] += stats[ROWS]
+                total[MAX_PER_RUN] = max(total[MAX_PER_RUN], stats[MAX_PER_RUN])
+        runs = sum(1 for run in _runs if run['started'] > cutoff)
+    return {'runs': runs, 'statements': _rows(totals, runs)}
+
+
+def export_json():
+    """Window aggregate plus the recent runs, as a JSON string."""
+    return json.dumps({
+        'generated': datetime.now().isoformat(timespec="seconds"),
+        'enabled': enabled,
+        'window_seconds': WINDOW_SECONDS,
+        'window': window_stats(),
+        'runs': recent_runs(RUN_HISTORY),
+    }, indent=2)
@@ -0,0 +1,104 @@
+import json
+import threading
+from bisect import bisect_right
+
+import db
+
+# ---------- DEFAULTS ----------
+# Used when a key is missing from global_settings (same values the Rules form falls back to)
+DEFAULTS = {
+    'max_squad_size': 25,
+    'min_squad_size': 18,
+    'max_overseas': 8,
+    'initial_purse': 1000000000,  # 100 Cr
+    'timing_bid_duration': 60,
+    'timing_rtm_decision': 30,
+    'timing_auto_break': 300,
+    'rtm_max_total': 2,
+    'rtm_max_indian': 1,
+    'rtm_max_overseas': 1,
+}
+
+# Increments used when bidding_tiers is missing, empty or unreadable:
+# < ₹1 Cr -> ₹5 L, < ₹2 Cr -> ₹10 L, < ₹5 Cr -> ₹25 L, above -> ₹50 L
+FALLBACK_TIER_LIMITS = [10000000, 20000000, 50000000]
+FALLBACK_TIER_INCREMENTS = [500000, 1000000, 2500000]
+FALLBACK_TOP_INCREMENT = 5000000
+
+
+class AuctionSettings:
+    """
+    Typed view of the global_settings table.
+
+    bidding_tiers is compiled once into parallel sorted arrays, so bid_increment()
+    is a bisect over ints with no JSON parsing.
+    """
+
+    def __init__(self, raw):
+        self.raw = dict(raw)
+        for key, default in DEFAULTS.items():
+            try:
+                setattr(self, key, int(self.raw.get(key, default)))
+            except (TypeError, ValueError):
+                setattr(self, key, default)
+        self.rtm_option = self.raw.get('rtm_option', 'true') == 'true'
+
+        try:
+            self.bidding_tiers = json.loads(self.raw.get('bidding_tiers', '[]'))
+        except ValueError as e:
+            print(f"Error reading bidding tiers: {e}")
+            self.bidding_tiers = []
+        self._compile_tiers()
+
+    def _compile_tiers(self):
+        # Tiers are matched in stored order: the first tier whose limit is above the
+        # bid wins. A tier whose limit isn't above every earlier limit can therefore
+        # never win, so keeping only the running maxima leaves a strictly increasing
+        # limits array with exactly the same answers.
+        limits, increments = [], []
+        try:
+            for tier in self.bidding_tiers:
+                limit, increment = int(tier['limit']), int(tier['increment'])
+                if not limits or limit > limits[-1]:
+                    limits.append(limit)
+                    increments.append(increment)
+            # Above all limits, the last tier's increment applies
+            top = int(self.bidding_tiers[-1]['increment'])
+        except (KeyError, IndexError, TypeError, ValueError):
+            limits, increments, top = FALLBACK_TIER_LIMITS, FALLBACK_TIER_INCREMENTS, FALLBACK_TOP_INCREMENT
+        self._tier_limits = limits
+        self._tier_increments = increments
+        self._top_increment = top
+
+    def bid_increment(self, current_bid):
+        """Increment for the next bid over current_bid."""
+        i = bisect_right(self._tier_limits, current_bid)
+        return self._tier_increments[i] if i < len(self._tier_limits) else self._top_increment
+
+    def rtm_limits(self):
+        return {'total': self.rtm_max_total, 'indian': self.rtm_max_indian, 'overseas': self.rtm_max_overseas}
+
+
+_lock = threading.Lock()
+_current = None
+
+
+def get_settings():
+    """Process-wide AuctionSettings, loaded on first use and kept until invalidate()."""
+    global _current
+    settings = _current
+    if settings is None:
+        with _lock:
+            if _current is None:
+                c = db.get_read_cursor()
+                c.execute("SELECT key, value FROM global_settings")
+                _current = AuctionSettings(c.fetchall())
+            settings = _current
+    return settings
+
+
+def invalidate():
+    """Drops the cached settings; call after writing global_settings (Save Regulations)."""
+    global _current
+    with _lock:
+        _current = None
@@ -0,0 +1,128 @@
+import threading
+import time
+
+import auction
+import bidtrace
+import db
+import settings
+
+# ---------- CONFIG ----------
+RECENT_BIDS = 3    # bids on the active lot shown in the live panel
+RECENT_SALES = 2   # sold players listed under the live panel's bids
+
+
+class AuctionSnapshot:
+    """
+    Everything the live pages read on a rerun, as of one state_version.
+
+    Built inside a single read transaction, so every field comes from the same
+    committed state and `version` is exactly the version that state had.
+    Instances are shared by all sessions through get_snapshot() and must be
+    treated as read-only, apart from the HTML cache behind rendered().
+    """
+
+    def __init__(self, version):
+        self.version = version
+        self.built_at = time.time()
+
+        c = db.get_read_cursor()
+
+        # Active lot
+        self.active_item = auction.get_active_item()
+        self.highest_bid = None
+        self.rtm_eligible = False
+        self.rtm = None  # pending RTM decision (rtm_state dict)
+        if self.active_item:
+            item_id, previous_team = self.active_item[0], self.active_item[11]
+            self.highest_bid = auction.get_highest_bid(item_id)
+            self.rtm = auction.get_pending_rtm(item_id)
+            if previous_team and previous_team != "None":
+                self.rtm_eligible = auction.check_rtm_eligibility(previous_team, self.active_item[4] == 'India')
+
+        # Teams: (name, budget_remaining, password) and (name, budget_remaining, logo_url)
+        c.execute("SELECT name, budget_remaining, password, logo_url FROM teams")
+        rows = c.fetchall()
+        self.teams = [(name, budget, password) for name, budget, password, _ in rows]
+        self.team_budgets = [(name, budget, logo) for name, budget, _, logo in rows]
+        self.team_logos = {name: logo for name, _, _, logo in rows}
+
+        # Bought players and team rating totals (ticker)
+        c.execute("SELECT name, rating, nationality, winner_team FROM items WHERE winner_team IS NOT NULL AND winner_team != 'UNSOLD'")
+        self.bought_players = c.fetchall()
+        c.execute("SELECT team_name, rating_sum FROM team_stats")
+        self.team_ratings = dict(c.fetchall())
+
+        # Recent sales: (item_name, sold_amount, team_bought, timestamp)
+        c.execute("SELECT item_name, sold_amount, team_bought, timestamp FROM sold_items ORDER BY timestamp DESC LIMIT ?", (RECENT_SALES,))
+        self.recent_sold = c.fetchall()
+
+        # The lot that closed last, for the 4s sold / unsold banner. Whether it is
+        # still recent enough is up to the reader (it depends on the time, not the state).
+        c.execute("SELECT id, name, rating, category, nationality, image_url, base_price, current_bid, is_active, winner_team, unsold_timestamp FROM items WHERE is_active = 0 ORDER BY unsold_timestamp DESC LIMIT 1")
+        self.last_unsold_item = c.fetchone()
+        c.execute("SELECT item_name, timestamp, team_bought, sold_amount FROM sold_items ORDER BY id DESC LIMIT 1")
+        self.last_sale = c.fetchone()
+        self.last_sold_item = None
+        if self.last_sale:
+            c.execute("SELECT id, name, rating, category, nationality, image_url, base_price, current_bid, is_active, winner_team, unsold_timestamp, previous_team, last_activity_timestamp FROM items WHERE name = ?", (self.last_sale[0],))
+            self.last_sold_item = c.fetchone()
+
+        # Latest bids for every lot the live panel may be showing: {item_id: [(team_name, amount, timestamp)]}
+        self.recent_bids = {}
+        for item in (self.active_item, self.last_sold_item, self.last_unsold_item):
+            if item and item[0] not in self.recent_bids:
+                c.execute("SELECT team_name, amount, timestamp FROM bids WHERE item_id = ? ORDER BY timestamp DESC LIMIT ?", (item[0], RECENT_BIDS))
+                self.recent_bids[item[0]] = c.fetchall()
+
+        c.execute("SELECT name, logo_url FROM sponsors")
+        self.sponsors = c.fetchall()
+
+        self.settings = settings.get_settings()
+
+        self._html = {}  # panel name -> HTML rendered from this snapshot
+
+    def rendered(self, name, render):
+        """
+        render(self), the finished HTML of a panel that depends on nothing but
+        this snapshot. Built by the first session to ask and then shared by all
+        of them until the state moves on; two sessions racing may both render,
+        with the same result.
+        """
+        html = self._html.get(name)
+        if html is None:
+            html = self._html[name] = render(self)
+        return html
+
+    def sponsor_logo(self, name, default=None):
+        return next((logo for sponsor, logo in self.sponsors if sponsor == name), default)
+
+
+_lock = threading.Lock()
+_current = None
+
+
+def _build():
+    conn = db.reader_pool.connection()
+    conn.execute("BEGIN")
+    try:
+        return AuctionSnapshot(auction.get_state_version())
+    finally:
+        conn.execute("COMMIT")
+
+
+def get_snapshot():
+    """
+    Returns the process-wide snapshot for the current state_version.
+    Costs one primary-key lookup while nothing has been written; after a write the
+    first caller rebuilds it and every other session reuses that copy.
+    """
+    global _current
+    version = auction.get_state_version()
+    snapshot = _current
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+    with _lock:
+        if _current is None or _current.version < version:
+            _current = _build()
+            bidtrace.snapshot_built(_current.version)
+        return _current
@@ -0,0 +1,39 @@
+import hashlib
+import os
+
+# The app's CSS, kept in ibl.css instead of <style> blocks scattered through
+# main.py. tag() is emitted first thing on every page run and never inside the
+# live fragments, so the per-second fragment reruns carry markup only.
+#
+# The tag is well over Streamlit's 10 KB message-cache threshold
+# (global.minCachedMessageSize) and byte-identical from run to run, so each
+# session receives the stylesheet once; later page runs send a reference to
+# the cached message instead. The content hash in the tag is the version: an
+# edit to ibl.css is a new message, picked up on the next page run.
+#
+# (static/ can't serve it: Streamlit's static route sends .css as text/plain
+# with nosniff, which browsers refuse to apply as a stylesheet.)
+
+# ---------- CONFIG ----------
+STYLESHEET = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ibl.css")
+
+_tag = {}  # mtime of STYLESHEET -> its <style> tag
+
+
+def compact(html):
+    """html (or CSS) on one line, whitespace runs collapsed; renders the same."""
+    return " ".join(html.split())
+
+
+def tag():
+    """<style> element carrying ibl.css, rebuilt only when the file changes."""
+    mtime = os.path.getmtime(STYLESHEET)
+    cached = _tag.get(mtime)
+    if cached is None:
+        with open(STYLESHEET, encoding="utf-8") as f:
+            css = compact(f.read())
+        version = hashlib.sha1(css.encode()).hexdigest()[:12]
+        cached = f'<style data-ibl-css="{version}">{css}</style>'
+        _tag.clear()
+        _tag[mtime] = cached
+    return cached
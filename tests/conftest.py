@@ -0,0 +1,84 @@
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+
+import pytest
+
+# Shared fixtures. The app modules read IBL_DB_PATH when they are first imported,
+# so it is pointed at a scratch directory before any of them is; every test that
+# asks for auction_db gets a fresh copy of one datagen auction there.
+
+# ---------- CONFIG ----------
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TMP_DIR = tempfile.mkdtemp(prefix="ibl-tests-")
+os.environ["IBL_DB_PATH"] = os.path.join(TMP_DIR, "auction.db")
+sys.path.insert(0, ROOT)
+
+import auction
+import datagen
+import db
+import engine
+import settings
+
+# Small enough to generate in well under a second, with sold, unsold, RTM and
+# never-auctioned players all present
+TEST_AUCTION = {'players': 60, 'teams': 4, 'bids': 300, 'seed': 1}
+
+
+def _remove_database(path):
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+@pytest.fixture(scope="session")
+def template_db():
+    path = os.path.join(TMP_DIR, "template.db")
+    datagen.generate(path, **TEST_AUCTION)
+    return path
+
+
+@pytest.fixture
+def auction_db(template_db):
+    """Fresh copy of the generated auction at IBL_DB_PATH, with the process-wide engine and settings reset."""
+    db.writer_pool.close_all()
+    db.reader_pool.close_all()
+    _remove_database(db.DB_PATH)
+    shutil.copy(template_db, db.DB_PATH)
+    engine._engine = None
+    settings.invalidate()
+    yield db.DB_PATH
+    db.writer_pool.close_all()
+    db.reader_pool.close_all()
+
+
+@pytest.fixture
+def query(auction_db):
+    """Runs one SQL statement on its own connection (committed) and returns the rows."""
+    def run(sql, params=()):
+        conn = sqlite3.connect(auction_db)
+        try:
+            rows = conn.execute(sql, params).fetchall()
+            conn.commit()
+            return rows
+        finally:
+            conn.close()
+    return run
+
+
+@pytest.fixture
+def open_lot(query):
+    """Starts bidding on a player that has never been auctioned; returns its id."""
+    def start(previous_team=None):
+        item_id = query("SELECT id FROM items WHERE winner_team IS NULL AND id NOT IN (SELECT item_id FROM bids) "
+                        "AND is_active = 0 ORDER BY id LIMIT 1")[0][0]
+        query("UPDATE items SET previous_team = ? WHERE id = ?", (previous_team, item_id))
+        auction.set_active_item(item_id)
+        return item_id
+    return start
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(TMP_DIR, ignore_errors=True)
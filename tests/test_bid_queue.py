@@ -0,0 +1,70 @@
+import threading
+
+import pytest
+
+import settings
+from bid_queue import BidQueue
+from engine import get_engine, BID_ACCEPTED, BID_STALE
+
+
+@pytest.fixture
+def bid_queue(auction_db):
+    queue = BidQueue(get_engine())
+    queue.start()
+    return queue
+
+
+def test_simultaneous_clicks_resolve_first_come_first_served(bid_queue, open_lot, query):
+    item_id = open_lot()
+    price = query("SELECT base_price FROM items WHERE id = ?", (item_id,))[0][0]
+    futures = [bid_queue.submit(item_id, f"T00{i % 4 + 1}", price, False) for i in range(20)]
+
+    statuses = [f.result(timeout=5)['status'] for f in futures]
+    assert statuses == [BID_ACCEPTED] + [BID_STALE] * 19
+    assert query("SELECT team_name, amount FROM bids WHERE item_id = ?", (item_id,)) == [("T001", price)]
+
+
+def test_queued_bids_apply_in_order(bid_queue, open_lot, query):
+    item_id = open_lot()
+    price = query("SELECT base_price FROM items WHERE id = ?", (item_id,))[0][0]
+    rules = settings.get_settings()
+    expected = [price]
+    for _ in range(4):
+        expected.append(expected[-1] + rules.bid_increment(expected[-1]))
+
+    # Each bid is placed on the price the previous one produces, so they only
+    # all succeed if the writer keeps submission order within a batch
+    seen = [price] + expected[:-1]
+    futures = [bid_queue.submit(item_id, "T001" if i % 2 == 0 else "T002", seen[i], i > 0)
+               for i in range(len(expected))]
+    assert [f.result(timeout=5)['amount'] for f in futures] == expected
+
+
+def test_place_bid_from_many_threads_waits_for_its_own_result(bid_queue, open_lot, query):
+    item_id = open_lot()
+    price = query("SELECT base_price FROM items WHERE id = ?", (item_id,))[0][0]
+    results = []
+    lock = threading.Lock()
+
+    def click(team):
+        result = bid_queue.place_bid(item_id, team, price, False)
+        with lock:
+            results.append(result['status'])
+
+    threads = [threading.Thread(target=click, args=(f"T00{i % 4 + 1}",)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(results) == [BID_ACCEPTED] + [BID_STALE] * 7
+
+
+def test_failed_batch_fails_every_future_in_it():
+    class BrokenEngine:
+        def place_bids(self, bids):
+            raise RuntimeError("database is locked")
+
+    queue = BidQueue(BrokenEngine())
+    queue.start()
+    with pytest.raises(RuntimeError):
+        queue.place_bid(1, "T001", 100, False, timeout=5)
@@ -0,0 +1,177 @@
+import threading
+
+import auction
+import settings
+from engine import (
+    get_engine, BID_ACCEPTED, BID_STALE, BID_INSUFFICIENT_BUDGET, BID_CLOSED,
+    STOP_SOLD, STOP_UNSOLD, STOP_RTM, STOP_PENDING, RTM_DECISION_CLOSED,
+)
+
+TEAMS = ["T001", "T002", "T003", "T004"]
+
+
+def base_price(query, item_id):
+    return query("SELECT base_price FROM items WHERE id = ?", (item_id,))[0][0]
+
+
+def team_without_rtms(query):
+    return query("SELECT team_name FROM team_stats WHERE rtm_total = 0 ORDER BY team_name LIMIT 1")[0][0]
+
+
+# ---------- BIDDING ----------
+
+def test_concurrent_bids_on_one_price_accept_exactly_one(open_lot, query):
+    item_id = open_lot()
+    price = base_price(query, item_id)
+    start = threading.Barrier(8)
+    results = [None] * 8
+
+    def bid(i):
+        start.wait()
+        results[i] = get_engine().place_bid(item_id, TEAMS[i % len(TEAMS)], price, False)
+
+    threads = [threading.Thread(target=bid, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    statuses = sorted(r['status'] for r in results)
+    assert statuses == [BID_ACCEPTED] + [BID_STALE] * 7
+    assert query("SELECT COUNT(*) FROM bids WHERE item_id = ?", (item_id,)) == [(1,)]
+
+
+def test_bids_climb_by_the_tier_increment(open_lot, query):
+    item_id = open_lot()
+    price = base_price(query, item_id)
+
+    first = auction.place_bid(item_id, "T001", price, False)
+    second = auction.place_bid(item_id, "T002", price, True)
+
+    assert first['status'] == BID_ACCEPTED and first['amount'] == price
+    assert second['status'] == BID_ACCEPTED
+    assert second['amount'] == price + settings.get_settings().bid_increment(price)
+    assert auction.get_highest_bid(item_id) == ("T002", second['amount'])
+
+
+def test_stale_bid_is_rejected(open_lot, query):
+    item_id = open_lot()
+    price = base_price(query, item_id)
+    auction.place_bid(item_id, "T001", price, False)
+
+    result = auction.place_bid(item_id, "T002", price, False)
+    assert result['status'] == BID_STALE
+    assert result['current_bid'] == price
+
+
+def test_bid_over_budget_is_rejected(open_lot, query):
+    item_id = open_lot()
+    query("UPDATE teams SET budget_remaining = 0 WHERE name = 'T001'")
+
+    result = auction.place_bid(item_id, "T001", base_price(query, item_id), False)
+    assert result['status'] == BID_INSUFFICIENT_BUDGET
+    assert query("SELECT COUNT(*) FROM bids WHERE item_id = ?", (item_id,)) == [(0,)]
+
+
+def test_bid_after_the_deadline_is_closed(open_lot, query):
+    item_id = open_lot()
+    query("UPDATE items SET last_activity_timestamp = last_activity_timestamp - ? WHERE id = ?",
+          (settings.get_settings().timing_bid_duration + 1, item_id))
+
+    result = auction.place_bid(item_id, "T001", base_price(query, item_id), False)
+    assert result['status'] == BID_CLOSED
+
+
+# ---------- STOPPING AND SELLING ----------
+
+def test_expire_before_the_deadline_leaves_the_lot_open(open_lot):
+    item_id = open_lot()
+
+    result = auction.expire_item(item_id)
+    assert result['outcome'] == STOP_PENDING
+    assert 0 < result['remaining'] <= settings.get_settings().timing_bid_duration
+    assert auction.get_active_item()[0] == item_id
+
+
+def test_expire_after_the_deadline_marks_an_unbid_lot_unsold(open_lot, query):
+    item_id = open_lot()
+    query("UPDATE items SET last_activity_timestamp = 1 WHERE id = ?", (item_id,))
+
+    assert auction.expire_item(item_id)['outcome'] == STOP_UNSOLD
+    assert auction.get_active_item() is None
+    assert query("SELECT winner_team FROM items WHERE id = ?", (item_id,)) == [("UNSOLD",)]
+
+
+def test_stop_sells_to_the_highest_bidder(open_lot, query):
+    item_id = open_lot()
+    price = base_price(query, item_id)
+    budget = auction.get_team_budget("T002")
+    auction.place_bid(item_id, "T001", price, False)
+    top = auction.place_bid(item_id, "T002", price, True)['amount']
+
+    result = auction.attempt_stop_bidding(item_id)
+    assert result['outcome'] == STOP_SOLD
+    assert result['sale'][:2] == ("T002", top)
+    assert auction.get_team_budget("T002") == budget - top
+    assert query("SELECT team_bought, sold_amount, is_rtm FROM sold_items WHERE item_name = ?", (result['sale'][2],)) == [("T002", top, 0)]
+
+
+def test_stop_without_bids_marks_the_lot_unsold(open_lot, query):
+    item_id = open_lot()
+
+    result = auction.attempt_stop_bidding(item_id)
+    assert result['outcome'] == STOP_UNSOLD
+    assert query("SELECT COUNT(*) FROM unsold_items WHERE item_name = ?", (result['name'],)) == [(1,)]
+
+
+# ---------- RIGHT TO MATCH ----------
+
+def rtm_lot(open_lot, query):
+    holder = team_without_rtms(query)
+    bidder = next(t for t in TEAMS if t != holder)
+    item_id = open_lot(previous_team=holder)
+    price = base_price(query, item_id)
+    auction.place_bid(item_id, bidder, price, False)
+    return item_id, holder, bidder, price
+
+
+def test_stop_opens_an_rtm_decision_and_closes_bidding(open_lot, query):
+    item_id, holder, bidder, price = rtm_lot(open_lot, query)
+
+    result = auction.attempt_stop_bidding(item_id)
+    assert result['outcome'] == STOP_RTM
+    assert result['rtm_state']['prev_team'] == holder
+    assert auction.place_bid(item_id, holder, price, True)['status'] == BID_CLOSED
+
+
+def test_resolve_rtm_retain_sells_to_the_previous_team(open_lot, query):
+    item_id, holder, bidder, price = rtm_lot(open_lot, query)
+    auction.attempt_stop_bidding(item_id)
+
+    result = auction.resolve_rtm(item_id, retain=True)
+    assert result['outcome'] == STOP_SOLD
+    assert result['sale'][:2] == (holder, price)
+    assert auction.get_rtm_stats(holder)['total'] == 1
+    assert auction.get_pending_rtm(item_id) is None
+
+
+def test_stale_rtm_answer_does_not_touch_the_next_lot(open_lot, query):
+    item_id, holder, bidder, price = rtm_lot(open_lot, query)
+    auction.attempt_stop_bidding(item_id)
+    auction.resolve_rtm(item_id, retain=False)
+    next_id = open_lot()
+
+    assert auction.resolve_rtm(item_id, retain=True)['outcome'] == RTM_DECISION_CLOSED
+    assert auction.get_active_item()[0] == next_id
+    assert query("SELECT team_bought FROM sold_items WHERE item_name = (SELECT name FROM items WHERE id = ?)", (item_id,)) == [(bidder,)]
+
+
+def test_expire_rtm_sells_to_the_bidder_once_due(open_lot, query):
+    item_id, holder, bidder, price = rtm_lot(open_lot, query)
+    auction.attempt_stop_bidding(item_id)
+    assert auction.expire_rtm(item_id)['outcome'] == STOP_PENDING
+
+    query("UPDATE rtm_decisions SET deadline = 1 WHERE item_id = ?", (item_id,))
+    result = auction.expire_rtm(item_id)
+    assert result['outcome'] == STOP_SOLD
+    assert result['sale'][:2] == (bidder, price)
@@ -0,0 +1,53 @@
+import io
+
+import pytest
+
+import player_import
+
+
+def csv_file(*lines):
+    return io.BytesIO(("\n".join(lines) + "\n").encode("utf-8"))
+
+
+def test_inserts_new_players_and_updates_existing_ones(auction_db, query):
+    existing = query("SELECT name FROM items ORDER BY id LIMIT 1")[0][0]
+    report = player_import.import_players(csv_file(
+        "Name,Rating,Category,Nationality,Base Price,Previous Team",
+        "New Opener,81,batsman,india,2000000,T001",
+        f"{existing},77,Bowler,England,₹2.00 Cr,",
+        "New Keeper,70,Wicketkeeper,Australia,₹50L,",
+    ), "players.csv", chunk_size=2)
+
+    assert (report['inserted'], report['updated'], report['errors'], report['rows']) == (2, 1, [], 3)
+    assert query("SELECT rating, category, nationality, base_price, previous_team FROM items WHERE name = 'New Opener'") == [
+        (81, "Batsman", "India", 2000000, "T001")]
+    assert query("SELECT rating, category, nationality, base_price FROM items WHERE name = ?", (existing,)) == [
+        (77, "Bowler", "England", 20000000)]
+    assert query("SELECT base_price FROM items WHERE name = 'New Keeper'") == [(5000000,)]
+
+
+def test_invalid_rows_are_reported_and_skipped(auction_db, query):
+    report = player_import.import_players(csv_file(
+        "name,rating,category,nationality,base_price,previous_team",
+        "Good Player,60,Allrounder,India,3000000,",
+        "Too Good,101,Bowler,India,3000000,",
+        "Nobody's,60,Spinner,Mars,3000000,",
+        "Free Agent,60,Bowler,India,0,",
+        "Wrong Team,60,Bowler,India,3000000,Nowhere XI",
+        "Good Player,61,Allrounder,India,3000000,",
+    ), "players.csv")
+
+    assert report['inserted'] == 1
+    assert [row for row, _, _ in report['errors']] == [3, 4, 5, 6, 7]
+    assert "duplicate of row 2" in report['errors'][-1][2]
+    assert query("SELECT COUNT(*) FROM items WHERE name IN ('Too Good', 'Nobody''s', 'Free Agent', 'Wrong Team')") == [(0,)]
+
+
+def test_sheet_without_required_columns_is_rejected(auction_db):
+    with pytest.raises(ValueError, match="base_price"):
+        player_import.import_players(csv_file("name,rating,category,nationality", "A,1,Bowler,India"), "players.csv")
+
+
+def test_unsupported_file_type_is_rejected(auction_db):
+    with pytest.raises(ValueError, match="Unsupported"):
+        player_import.import_players(io.BytesIO(b""), "players.txt")
@@ -0,0 +1,12 @@
+import db
+
+
+def test_hot_queries_are_index_backed(auction_db):
+    full_scans = {name: plan for name, (index_backed, plan) in db.explain_hot_queries().items() if not index_backed}
+    assert not full_scans, f"full table scans: {full_scans}"
+
+
+def test_full_scan_is_reported(auction_db, monkeypatch):
+    monkeypatch.setitem(db.HOT_QUERIES, "unindexed", ("SELECT * FROM sold_items WHERE sold_amount = ?", (0,)))
+    index_backed, plan = db.explain_hot_queries()["unindexed"]
+    assert not index_backed, plan
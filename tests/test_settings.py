@@ -0,0 +1,47 @@
+import json
+import random
+
+from settings import AuctionSettings, FALLBACK_TIER_INCREMENTS, FALLBACK_TOP_INCREMENT
+
+
+def linear_increment(tiers, current_bid):
+    """The original lookup: first tier (in stored order) whose limit is above the bid."""
+    for tier in tiers:
+        if current_bid < int(tier['limit']):
+            return int(tier['increment'])
+    return int(tiers[-1]['increment'])
+
+
+def with_tiers(tiers):
+    return AuctionSettings({'bidding_tiers': json.dumps(tiers)})
+
+
+def test_bisect_matches_the_linear_lookup():
+    rng = random.Random(3)
+    for _ in range(200):
+        # Unsorted, duplicated and decreasing limits included on purpose
+        tiers = [{'limit': rng.randrange(1, 50) * 1000000, 'increment': rng.randrange(1, 20) * 100000}
+                 for _ in range(rng.randint(1, 6))]
+        rules = with_tiers(tiers)
+        for bid in [0, 999999, 1000000] + [rng.randrange(0, 60000000) for _ in range(50)] + [int(t['limit']) for t in tiers]:
+            assert rules.bid_increment(bid) == linear_increment(tiers, bid), (tiers, bid)
+
+
+def test_bid_on_a_limit_uses_the_next_tier():
+    rules = with_tiers([{'limit': 10000000, 'increment': 500000}, {'limit': 20000000, 'increment': 1000000}])
+    assert rules.bid_increment(9999999) == 500000
+    assert rules.bid_increment(10000000) == 1000000
+    assert rules.bid_increment(20000000) == 1000000
+
+
+def test_missing_or_broken_tiers_fall_back_to_the_defaults():
+    for raw in ({}, {'bidding_tiers': '[]'}, {'bidding_tiers': 'not json'}, {'bidding_tiers': '[{"limit": 5}]'}):
+        rules = AuctionSettings(raw)
+        assert rules.bid_increment(0) == FALLBACK_TIER_INCREMENTS[0]
+        assert rules.bid_increment(10 ** 12) == FALLBACK_TOP_INCREMENT
+
+
+def test_unreadable_numbers_fall_back_to_the_defaults():
+    rules = AuctionSettings({'timing_bid_duration': 'soon', 'rtm_max_total': '3'})
+    assert rules.timing_bid_duration == 60
+    assert rules.rtm_limits()['total'] == 3
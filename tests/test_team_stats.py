@@ -0,0 +1,66 @@
+import random
+
+import auction
+
+# team_stats is kept by triggers; after any mix of writes it must equal the
+# same numbers recomputed from items and sold_items
+
+SQUAD = '''SELECT winner_team, COUNT(*), SUM(rating), SUM(category IS 'Batsman'), SUM(category IS 'Bowler'),
+                  SUM(category IS 'Allrounder'), SUM(category IS 'Wicketkeeper'),
+                  SUM(nationality IS 'India'), SUM(nationality IS NOT 'India')
+           FROM items WHERE winner_team IS NOT NULL AND winner_team != 'UNSOLD' GROUP BY winner_team'''
+SALES = '''SELECT team_bought, SUM(sold_amount), SUM(is_rtm = 1), SUM(is_rtm = 1 AND nationality IS 'India'),
+                  SUM(is_rtm = 1 AND nationality IS NOT 'India')
+           FROM sold_items GROUP BY team_bought'''
+LEDGER = '''SELECT team_name, players, rating_sum, batsmen, bowlers, allrounders, wicketkeepers, indian, overseas,
+                   spent, rtm_total, rtm_indian, rtm_overseas
+            FROM team_stats'''
+
+
+def ledger_mismatches(query):
+    expected = {}
+    for team, *squad in query(SQUAD):
+        expected[team] = list(squad) + [0, 0, 0, 0]
+    for team, *sales in query(SALES):
+        expected.setdefault(team, [0] * 8 + [0, 0, 0, 0])[8:] = sales
+    actual = {team: list(row) for team, *row in query(LEDGER)}
+    empty = [0] * 12
+    return {team: (actual.get(team, empty), expected.get(team, empty))
+            for team in set(expected) | set(actual)
+            if actual.get(team, empty) != expected.get(team, empty)}
+
+
+def test_backfilled_ledger_matches_the_auction(auction_db, query):
+    assert ledger_mismatches(query) == {}
+
+
+def test_ledger_follows_sales_resets_and_unsold_lots(auction_db, query):
+    rng = random.Random(7)
+    teams = [name for (name,) in query("SELECT name FROM teams")]
+    items = [item_id for (item_id,) in query("SELECT id FROM items")]
+    for _ in range(60):
+        item_id = rng.choice(items)
+        auction.set_active_item(item_id)
+        current = auction.get_active_item()[7]
+        has_bids = auction.get_highest_bid(item_id) is not None
+        if rng.random() < 0.7:
+            result = auction.place_bid(item_id, rng.choice(teams), current, has_bids)
+            if result['status'] == 'accepted' and rng.random() < 0.5:
+                auction.place_bid(item_id, rng.choice(teams), result['amount'], True)
+            stopped = auction.attempt_stop_bidding(item_id)
+            if stopped and stopped['outcome'] == 'rtm':
+                auction.resolve_rtm(item_id, retain=rng.random() < 0.5)
+        else:
+            auction.mark_as_unsold(item_id)
+
+    assert ledger_mismatches(query) == {}
+    assert query("SELECT COUNT(*) FROM team_stats WHERE team_name = 'UNSOLD'") == [(0,)]
+
+
+def test_deleting_a_sold_player_updates_the_ledger(auction_db, query):
+    item_id, team = query("SELECT id, winner_team FROM items WHERE winner_team IS NOT NULL AND winner_team != 'UNSOLD' LIMIT 1")[0]
+    before = auction.get_team_squad_info(team)['total_players_bought']
+
+    auction.delete_item(item_id)
+    assert auction.get_team_squad_info(team)['total_players_bought'] == before - 1
+    assert ledger_mismatches(query) == {}